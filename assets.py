@@ -0,0 +1,117 @@
+# assets.py
+# shared image cache: every image is decoded, converted and scaled only once
+# and the same Surface is handed out to every sprite that needs it
+# images come from the pre-scaled asset bundle (bundle.py) when there is an
+# up-to-date one, from the image files otherwise
+
+import pygame
+import os
+import settings as s
+
+_images = {}
+_tank_images = {} # (kind, TILE_SIZE) -> directional images
+_fonts = {}
+_bundle = None # bundle.Bundle, False if there is none
+
+# directional image sets for every tank kind
+TANK_IMAGE_FILES = {
+    'P1': {'UP': s.IMG_P1_UP, 'DOWN': s.IMG_P1_DOWN, 'LEFT': s.IMG_P1_LEFT, 'RIGHT': s.IMG_P1_RIGHT},
+    'P2': {'UP': s.IMG_P2_UP, 'DOWN': s.IMG_P2_DOWN, 'LEFT': s.IMG_P2_LEFT, 'RIGHT': s.IMG_P2_RIGHT},
+    'white': {'UP': s.IMG_ENEMY_WHITE_UP, 'DOWN': s.IMG_ENEMY_WHITE_DOWN,
+              'LEFT': s.IMG_ENEMY_WHITE_LEFT, 'RIGHT': s.IMG_ENEMY_WHITE_RIGHT},
+    'green': {'UP': s.IMG_ENEMY_GREEN_UP, 'DOWN': s.IMG_ENEMY_GREEN_DOWN,
+              'LEFT': s.IMG_ENEMY_GREEN_LEFT, 'RIGHT': s.IMG_ENEMY_GREEN_RIGHT},
+}
+
+#load resources (uncached, used by the cache below)
+def load_image(filename, size=None):
+    if size is None:
+        size = (s.TILE_SIZE, s.TILE_SIZE)
+    path = os.path.join(s.IMAGE_DIR, filename)
+    try:
+        image = pygame.image.load(path)
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha() # needs a window, skipped when headless
+    except (pygame.error, FileNotFoundError) as e: 
+        print(f"Error: Unable to load image '{filename}' at path '{path}'.")
+        print(f"Details: {e}")
+        placeholder = pygame.Surface(size)
+        placeholder.fill(s.YELLOW) 
+        return placeholder
+    image = pygame.transform.scale(image, size)
+    return image
+
+# cached version of load_image, the returned Surface is shared so never draw on it
+def get_image(filename, size=None):
+    if size is None:
+        size = (s.TILE_SIZE, s.TILE_SIZE)
+    key = (filename, size)
+    image = _images.get(key)
+    if image is None:
+        image = _bundled_image(filename, size)
+        if image is None:
+            image = load_image(filename, size)
+        _images[key] = image
+    return image
+
+# bullet surface is shrunk to a quarter tile once
+def get_bullet_image():
+    return get_image(s.IMG_BULLET, (s.TILE_SIZE // 4, s.TILE_SIZE // 4))
+
+# {'UP': surface, 'DOWN': ..., 'LEFT': ..., 'RIGHT': ...} for 'P1', 'P2', 'white' or 'green'
+def get_tank_images(kind):
+    key = (kind, s.TILE_SIZE)
+    images = _tank_images.get(key)
+    if images is None:
+        images = {d: get_image(f) for d, f in TANK_IMAGE_FILES[kind].items()}
+        _tank_images[key] = images
+    return images
+
+# one Font object per (font file, size), building a Font is slow
+def get_font(font_name, size):
+    key = (font_name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.Font(font_name, size)
+        _fonts[key] = font
+    return font
+
+# the asset bundle, opened (memory-mapped) on first use
+def get_bundle():
+    global _bundle
+    if _bundle is None:
+        import bundle
+        _bundle = bundle.open_bundle() or False
+    return _bundle or None
+
+def _bundled_image(filename, size):
+    packed = get_bundle()
+    image = packed.image(filename, size) if packed is not None else None
+    if image is not None and pygame.display.get_surface() is not None:
+        image = image.convert_alpha()
+    return image
+
+# (filename, size) of every image the game uses (what bundle.py packs)
+def preload_list():
+    tile = (s.TILE_SIZE, s.TILE_SIZE)
+    images = [(filename, tile) for filename in (s.IMG_WALL_RED, s.IMG_WALL_IRON, s.IMG_BUSH, s.IMG_BOSS)]
+    images.append((s.IMG_BULLET, (s.TILE_SIZE // 4, s.TILE_SIZE // 4)))
+    for files in TANK_IMAGE_FILES.values():
+        images += [(filename, tile) for filename in files.values()]
+    return images
+
+# decode everything up front so the first shot / spawn doesn't hitch
+# call after the display mode is set so the surfaces get convert_alpha()
+def preload():
+    for filename, size in preload_list():
+        get_image(filename, size)
+    for kind in TANK_IMAGE_FILES:
+        get_tank_images(kind)
+
+# drop all cached surfaces (e.g. after TILE_SIZE or display changes)
+def clear():
+    global _bundle
+    _images.clear()
+    _tank_images.clear()
+    _fonts.clear()
+    _bundle = None
@@ -0,0 +1,94 @@
+# audio.py
+# sound effects through a fixed pool of mixer channels (Game.audio)
+# every sound has a priority and a rate limit (settings.SOUNDS): a bullet
+# storm starts a few fire sounds per window instead of one per shot, and a
+# full pool only gives way to a more important sound (explosions over shots
+# over ricochets), taking the channel that has been playing longest
+# NullAudio is the backend for headless runs and machines without audio,
+# play() returns straight away
+# sounds come from the asset bundle (bundle.py) if it was built for the
+# mixer's sample format
+
+import os
+import collections
+import pygame
+import settings as s
+import assets
+
+
+class NullAudio:
+    def play(self, name):
+        return None
+
+
+class Audio:
+    def __init__(self, channels=None, sounds=None):
+        channels = channels or s.AUDIO_CHANNELS
+        pygame.mixer.set_num_channels(channels)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.playing = [None] * channels # (priority, start ms) of what each channel last started
+        self.sounds = {} # name -> (Sound, priority, starts per window)
+        self.recent = {} # name -> start times within the window
+        for name, (filename, priority, limit) in (sounds or s.SOUNDS).items():
+            sound = load_sound(filename)
+            if sound is not None:
+                self.sounds[name] = (sound, priority, limit)
+                self.recent[name] = collections.deque()
+
+    def play(self, name):
+        entry = self.sounds.get(name)
+        if entry is None:
+            return None
+        sound, priority, limit = entry
+        now = pygame.time.get_ticks()
+        recent = self.recent[name]
+        while recent and now - recent[0] >= s.SOUND_RATE_WINDOW:
+            recent.popleft()
+        if len(recent) >= limit:
+            return None
+        index = self._channel(priority)
+        if index is None:
+            return None
+        recent.append(now)
+        self.playing[index] = (priority, now)
+        channel = self.channels[index]
+        channel.play(sound)
+        return channel
+
+    # a free channel, else the one playing the least important (then oldest)
+    # sound below this priority
+    def _channel(self, priority):
+        victim = None
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+            playing = self.playing[index]
+            if playing is not None and playing[0] < priority and (victim is None or playing < self.playing[victim]):
+                victim = index
+        return victim
+
+
+def load_sound(filename):
+    packed = assets.get_bundle()
+    sound = packed.sound(filename) if packed is not None else None
+    if sound is not None:
+        return sound
+    path = os.path.join(s.SOUND_DIR, filename)
+    try:
+        return pygame.mixer.Sound(path)
+    except (pygame.error, FileNotFoundError) as e:
+        print(f"Error: Unable to load sound '{filename}' at path '{path}'.")
+        print(f"Details: {e}")
+        return None
+
+
+# the pygame backend if the mixer starts, NullAudio otherwise
+def create(headless=False):
+    if headless:
+        return NullAudio()
+    try:
+        pygame.mixer.init()
+    except pygame.error as e:
+        print(f"Audio disabled: {e}")
+        return NullAudio()
+    return Audio()
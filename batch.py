@@ -0,0 +1,169 @@
+# batch.py
+# run many headless matches in parallel for balance testing
+# every combination of setting overrides is played once per seed, spread over
+# a process pool, and each match result is written to a JSONL file as soon
+# as it finishes
+#
+# example:
+#   python batch.py --set ENEMY_SPEED=1,2,3 --set BULLET_SPEED=7,10 --seeds 0-49 --out results.jsonl
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+import settings as s
+
+# settings a sweep may change, snapshot taken before any override so pooled
+# worker processes can go back to the defaults between matches
+DEFAULT_SETTINGS = {name: getattr(s, name) for name in dir(s) if name.isupper()}
+
+DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT']
+
+
+# simple seeded bot so headless matches actually play out:
+# keeps a random direction for a while and fires often
+class RandomBot:
+    def __init__(self, seed, shoot_chance=0.05):
+        self.rng = random.Random(seed)
+        self.shoot_chance = shoot_chance
+        self.direction = {}
+        self.frames_left = {}
+
+    def __call__(self, game, player):
+        num = player.player_num
+        if self.frames_left.get(num, 0) <= 0:
+            self.direction[num] = self.rng.choice(DIRECTIONS + [None])
+            self.frames_left[num] = self.rng.randint(15, 90)
+        self.frames_left[num] -= 1
+        return self.direction[num], self.rng.random() < self.shoot_chance
+
+
+def apply_overrides(overrides):
+    for name, value in DEFAULT_SETTINGS.items():
+        setattr(s, name, value)
+    for name, value in overrides.items():
+        setattr(s, name, value)
+
+
+def match_result(game):
+    p1, p2 = game.player1.score, game.player2.score
+    if game.game_victory:
+        winner = 'P1' if p1 > p2 else 'P2' if p2 > p1 else 'tie'
+    elif game.game_over:
+        winner = game.winner
+    else:
+        winner = None # timed out
+    return {
+        'winner': winner,
+        'victory': game.game_victory,
+        'game_over': game.game_over,
+        'timed_out': game.timed_out,
+        'frames': game.frame_count,
+        'duration_ms': game.clock.get_ticks(),
+        'p1_score': p1,
+        'p2_score': p2,
+        'kills': p1 + p2,
+        'enemies_spawned': game.enemies_spawned,
+        'p1_hp': game.player1.hp,
+        'p2_hp': game.player2.hp,
+    }
+
+
+# one Game per worker process, restarted in place for every match with the
+# same overrides; settings read while the game and its world are built
+# (ENGINE, TILE_SIZE, FPS, hp and speeds, ...) need a new Game to take effect.
+# The clock step, broadphase cells and tank images are sized from the
+# settings current when they are made, so they follow FPS / TILE_SIZE too
+_game = None
+_game_overrides = None
+
+
+# runs in a worker process
+def play_match(job):
+    global _game, _game_overrides
+    overrides, seed, max_frames = job
+    from main import Game # imported here so the parent never touches pygame
+    from simclock import SimClock
+
+    apply_overrides(overrides)
+    random.seed(seed)
+    started = time.perf_counter()
+    if _game is None or overrides != _game_overrides:
+        _game = Game(headless=True)
+        _game_overrides = overrides
+    game = _game
+    game.clock = SimClock(1000 / s.FPS)
+    game.controller = RandomBot(seed)
+    game.new_game()
+    game.run(max_frames=max_frames)
+    result = {'overrides': overrides, 'seed': seed}
+    result.update(match_result(game))
+    result['wall_time_s'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+# "0-9,20,30" -> [0..9, 20, 30]
+def parse_seeds(text):
+    seeds = []
+    for part in text.split(','):
+        if '-' in part[1:]:
+            first, last = part.split('-', 1)
+            seeds.extend(range(int(first), int(last) + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+# {'ENEMY_SPEED': [1, 2]} -> [{'ENEMY_SPEED': 1}, {'ENEMY_SPEED': 2}]
+def expand_grid(grid):
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run headless matches over a grid of setting overrides.')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=V1,V2',
+                        help='values to sweep for one setting (repeatable)')
+    parser.add_argument('--grid', help='JSON file mapping setting names to lists of values')
+    parser.add_argument('--seeds', default='0-9', help='seed list, e.g. "0-99" or "1,5,9" (default: 0-9)')
+    parser.add_argument('--max-frames', type=int, default=s.FPS * 60 * 5, help='frame limit per match')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='worker processes (default: all cores)')
+    parser.add_argument('--out', default='results.jsonl', help='results file, one JSON object per match')
+    args = parser.parse_args(argv)
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid.update(json.load(f))
+    for item in args.set:
+        name, _, values = item.partition('=')
+        grid[name.strip()] = [parse_value(v.strip()) for v in values.split(',')]
+    for name in grid:
+        if name not in DEFAULT_SETTINGS:
+            parser.error(f"unknown setting '{name}'")
+
+    jobs = [(overrides, seed, args.max_frames)
+            for overrides in expand_grid(grid) for seed in parse_seeds(args.seeds)]
+    print(f"Running {len(jobs)} matches on {args.workers} workers -> {args.out}")
+
+    with open(args.out, 'w') as out, multiprocessing.Pool(args.workers) as pool:
+        for done, result in enumerate(pool.imap_unordered(play_match, jobs), 1):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            print(f"[{done}/{len(jobs)}] {result['overrides']} seed={result['seed']} winner={result['winner']}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# benchmark.py
+# scripted, seeded performance scenarios with per-phase frame timing
+# each scenario runs in a fresh process (settings are patched before the
+# game modules are imported) with the dummy SDL video/audio drivers, a
+# fixed-step SimClock and bot players. Results are written as JSON so runs
+# from different commits can be compared with --compare.
+#
+#   python benchmark.py --out bench.json
+#   python benchmark.py --compare bench.json
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    # stock map, default ENEMY_* settings
+    'stock': {
+        'frames': 1800,
+        'settings': {},
+        'shoot_chance': 0.05,
+    },
+    # lots of enemies firing constantly, no clear-shot check
+    'bullet_storm': {
+        'frames': 1200,
+        'settings': {'ENEMY_MAX_ON_SCREEN': 40, 'ENEMY_START_COUNT': 40, 'ENEMY_TOTAL_COUNT': 1000,
+                     'ENEMY_SHOOT_COOLDOWN': 150, 'ENEMY_REQUIRE_CLEAR_SHOT': False,
+                     'BULLET_COOLDOWN': 50, 'PLAYER_HP': 1000000},
+        'shoot_chance': 1.0,
+    },
+    # as many enemies as the map has spawn tiles
+    'max_enemies': {
+        'frames': 1200,
+        'settings': {'ENEMY_MAX_ON_SCREEN': 300, 'ENEMY_START_COUNT': 300, 'ENEMY_TOTAL_COUNT': 1000,
+                     'PLAYER_HP': 1000000},
+        'shoot_chance': 0.05,
+    },
+    # generated 64x64 map
+    'large_map': {
+        'frames': 1200,
+        'settings': {'ENEMY_MAX_ON_SCREEN': 40, 'ENEMY_START_COUNT': 40, 'ENEMY_TOTAL_COUNT': 1000},
+        'map_size': (64, 64),
+        'shoot_chance': 0.05,
+    },
+}
+
+
+# random map with an iron border, scattered walls/bushes, a 2x2 boss near the
+# bottom and free spawn tiles for both players
+def generate_map(width, height, seed):
+    import settings as s
+    rng = random.Random(seed)
+    tiles = [s.MAP_TILE_EMPTY, s.MAP_TILE_RED_WALL, s.MAP_TILE_IRON_WALL, s.MAP_TILE_BUSH]
+    weights = [75, 15, 4, 6]
+    data = [[rng.choices(tiles, weights)[0] for _ in range(width)] for _ in range(height)]
+    for x in range(width):
+        data[0][x] = data[height - 1][x] = s.MAP_TILE_IRON_WALL
+    for y in range(height):
+        data[y][0] = data[y][width - 1] = s.MAP_TILE_IRON_WALL
+    bx, by = width // 2 - 1, height - 4
+    for y in range(by - 1, by + 3):
+        for x in range(bx - 1, bx + 3):
+            data[y][x] = s.MAP_TILE_EMPTY
+    for y in (by, by + 1):
+        for x in (bx, bx + 1):
+            data[y][x] = s.MAP_TILE_BOSS
+    p1, p2 = (bx - 4, height - 2), (bx + 5, height - 2)
+    for x, y in (p1, p2):
+        data[y][x] = s.MAP_TILE_EMPTY
+    return data, p1, p2
+
+
+# runs in a fresh process
+def run_scenario(name, seed, overrides):
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    import settings as s
+    scenario = SCENARIOS[name]
+    for key, value in dict(scenario['settings'], **overrides).items():
+        setattr(s, key, value)
+
+    from main import Game
+    from simclock import SimClock
+    from profiling import FrameProfiler
+    from batch import RandomBot
+
+    import mapfile
+    game_map = None
+    if 'map_size' in scenario:
+        game_map = mapfile.from_rows(*generate_map(*scenario['map_size'], seed))
+
+    random.seed(seed)
+    game = Game(clock=SimClock(), controller=RandomBot(seed, scenario['shoot_chance']), game_map=game_map)
+    game.new_game()
+    game.profiler = FrameProfiler()
+    started = time.perf_counter()
+    game.run(max_frames=scenario['frames'])
+    elapsed = time.perf_counter() - started
+    return {
+        'frames': game.frame_count,
+        'wall_time_s': round(elapsed, 4),
+        'fps': round(game.frame_count / elapsed, 1),
+        'enemies_at_end': game.enemy_count(),
+        'phases': game.profiler.summary(),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(results, baseline=None):
+    for name, result in results['scenarios'].items():
+        print(f"\n{name}: {result['frames']} frames, {result['fps']} fps")
+        print(f"  {'phase':<22}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}   ms")
+        old = (baseline or {}).get('scenarios', {}).get(name, {}).get('phases', {})
+        for phase, st in result['phases'].items():
+            line = f"  {phase:<22}" + ''.join(f"{st[k]:>9.3f}" for k in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'))
+            if phase in old and old[phase]['mean_ms'] > 0:
+                line += f"   {st['mean_ms'] / old[phase]['mean_ms']:.2f}x vs baseline"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the performance scenarios.')
+    parser.add_argument('scenarios', nargs='*', help=f"scenarios to run (default: all of {', '.join(SCENARIOS)})")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--engine', choices=['sprites', 'numpy'], default='sprites')
+    parser.add_argument('--out', help='write the results as JSON')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario '{name}'")
+
+    results = {'revision': git_revision(), 'seed': args.seed, 'engine': args.engine, 'scenarios': {}}
+    context = multiprocessing.get_context('spawn') # clean settings/map per scenario
+    for name in names:
+        pool = context.Pool(1)
+        try:
+            results['scenarios'][name] = pool.apply(run_scenario, (name, args.seed, {'ENGINE': args.engine}))
+        finally:
+            # close + join rather than terminate(): SDL catches SIGTERM in the worker
+            pool.close()
+            pool.join()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# broadphase.py
+# uniform spatial hash for the moving objects (tanks and bullets)
+# rebuilt every tick for the bullet and tank collisions; only
+# objects sharing a cell are tested against each other, and pairs with the
+# same owner ('P1', 'P2', 'Enemy') or two bullets are dropped before the
+# rect test
+
+import settings as s
+
+
+class SpatialHash:
+    # cell_size defaults to two tiles at the TILE_SIZE set when the hash is made
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size if cell_size is not None else s.TILE_SIZE * 2
+        self.cells = {}
+        self.entries = [] # (sprite, is_bullet)
+        self.tests = 0 # rect tests done by pairs(), for telemetry
+
+    # tanks and bullets are any iterables of sprites with .rect and .owner
+    def rebuild(self, tank_groups, bullets=()):
+        self.cells = {}
+        self.entries = []
+        for group in tank_groups:
+            for sprite in group:
+                self.insert(sprite, False)
+        for bullet in bullets:
+            self.insert(bullet, True)
+
+    def insert(self, sprite, is_bullet):
+        index = len(self.entries)
+        self.entries.append((sprite, is_bullet))
+        rect = sprite.rect
+        size = self.cell_size
+        x0, x1 = rect.left // size, (rect.right - 1) // size
+        y0, y1 = rect.top // size, (rect.bottom - 1) // size
+        if x0 == x1 and y0 == y1:
+            keys = ((x0, y0),) # most bullets and many tanks sit in one cell
+        else:
+            keys = [(cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1)]
+        cells = self.cells
+        for key in keys:
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [index]
+            else:
+                cell.append(index)
+
+    # the (tank, bullet) pairs of pairs() after rebuild(tank_groups, bullets),
+    # for the bullet collisions of a tick
+    def bullet_pairs(self, tank_groups, bullets):
+        bullets = list(bullets)
+        self.rebuild(tank_groups, bullets)
+        is_bullet = {id(bullet) for bullet in bullets}
+        return [(a, b) for a, b in self.pairs() if id(b) in is_bullet]
+
+    # (sprite, is_bullet) entries in the cells a rect touches, in insertion order
+    # (used to cull drawing to the camera view; callers test the exact rect)
+    def query(self, rect):
+        size = self.cell_size
+        found = set()
+        for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is not None:
+                    found.update(cell)
+        return [self.entries[i] for i in sorted(found)]
+
+    # list of (a, b) overlapping pairs with different owners, each pair once
+    # a bullet is always returned as b, tanks keep insertion order
+    def pairs(self):
+        entries = self.entries
+        seen = set()
+        result = []
+        for cell in self.cells.values():
+            if len(cell) < 2:
+                continue
+            for n, i in enumerate(cell):
+                sprite_i, bullet_i = entries[i]
+                for j in cell[n + 1:]:
+                    sprite_j, bullet_j = entries[j]
+                    if bullet_i and bullet_j:
+                        continue
+                    if sprite_i.owner == sprite_j.owner:
+                        continue
+                    if (i, j) in seen:
+                        continue
+                    seen.add((i, j))
+                    self.tests += 1
+                    if sprite_i.rect.colliderect(sprite_j.rect):
+                        if bullet_i:
+                            result.append((sprite_j, sprite_i))
+                        else:
+                            result.append((sprite_i, sprite_j))
+        return result
@@ -0,0 +1,137 @@
+# bundle.py
+# every image and sound the game loads, packed into one file ready to use
+#
+# images are stored as RGBA pixels already scaled to the size the game asks
+# for (which depends on TILE_SIZE), sounds as raw samples in the mixer's
+# format. At startup the bundle is memory-mapped and surfaces are made
+# straight from its bytes, so nothing is decoded or scaled. The bundle is
+# built ahead of time and only used while it matches: same TILE_SIZE and
+# mixer format, and no source file changed (size, mtime) since the build;
+# otherwise assets.py and audio.py load the source files as before.
+#
+#   python bundle.py [--out resources/assets.bundle]
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import settings as s
+
+BUNDLE_PATH = os.path.join(s.RESOURCE_DIR, 'assets.bundle')
+
+# magic, tile size, mixer frequency, mixer sample format, mixer channels, entry count
+HEADER = struct.Struct('<8sIIhHI')
+MAGIC = b'TWPACK1\x00'
+# source file (relative to its resource dir), kind, width, height,
+# source size, source mtime_ns, data offset, data length
+ENTRY = struct.Struct('<60sBxHHqqII')
+IMAGE, SOUND = 0, 1
+
+
+class Bundle:
+    def __init__(self, images, sounds, mixer_format, buffer):
+        self.images = images # (filename, (w, h)) -> RGBA bytes (memoryview)
+        self.sounds = sounds # filename -> raw samples (memoryview)
+        self.mixer_format = mixer_format # (frequency, format, channels) of the samples
+        self._buffer = buffer # keeps the mmap alive
+
+    def image(self, filename, size):
+        import pygame
+        data = self.images.get((filename, size))
+        if data is None:
+            return None
+        return pygame.image.frombuffer(data, size, 'RGBA')
+
+    def sound(self, filename):
+        import pygame
+        data = self.sounds.get(filename)
+        if data is None or pygame.mixer.get_init() != self.mixer_format:
+            return None
+        return pygame.mixer.Sound(buffer=data)
+
+
+def _source(kind, filename):
+    return os.path.join(s.IMAGE_DIR if kind == IMAGE else s.SOUND_DIR, filename)
+
+
+def _align(offset):
+    return (offset + 3) & ~3
+
+
+# pack everything assets.preload() and the audio backend would load
+def build(out_path=None):
+    import pygame
+    import assets
+    out_path = out_path or BUNDLE_PATH
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.mixer.init()
+    frequency, sample_format, channels = pygame.mixer.get_init()
+
+    entries = []
+    for filename, size in assets.preload_list():
+        image = assets.load_image(filename, size)
+        entries.append((IMAGE, filename, size, pygame.image.tobytes(image, 'RGBA')))
+    for filename in sorted({sound[0] for sound in s.SOUNDS.values()}):
+        entries.append((SOUND, filename, (0, 0), pygame.mixer.Sound(_source(SOUND, filename)).get_raw()))
+
+    offset = _align(HEADER.size + ENTRY.size * len(entries))
+    index, data = [], []
+    for kind, filename, (w, h), payload in entries:
+        st = os.stat(_source(kind, filename))
+        index.append(ENTRY.pack(filename.encode('utf-8'), kind, w, h, st.st_size, st.st_mtime_ns,
+                                offset, len(payload)))
+        data.append(payload + bytes(_align(len(payload)) - len(payload)))
+        offset += len(data[-1])
+    header = HEADER.pack(MAGIC, s.TILE_SIZE, frequency, sample_format, channels, len(entries))
+    head = header + b''.join(index)
+    head += bytes(_align(len(head)) - len(head))
+
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(head)
+        f.writelines(data)
+    os.replace(tmp_path, out_path)
+    return len(entries), offset
+
+
+# the bundle at path, None if there is none or it's out of date
+def open_bundle(path=None):
+    path = path or BUNDLE_PATH
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, tile_size, frequency, sample_format, channels, count = HEADER.unpack_from(buffer)
+    if magic != MAGIC or tile_size != s.TILE_SIZE:
+        return None
+    view = memoryview(buffer)
+    images, sounds = {}, {}
+    for i in range(count):
+        name, kind, w, h, size, mtime, offset, length = ENTRY.unpack_from(buffer, HEADER.size + i * ENTRY.size)
+        filename = name.rstrip(b'\x00').decode('utf-8')
+        try:
+            st = os.stat(_source(kind, filename))
+        except FileNotFoundError:
+            return None
+        if st.st_size != size or st.st_mtime_ns != mtime:
+            print(f"{path} is out of date ({filename} changed), run bundle.py again")
+            return None
+        if kind == IMAGE:
+            images[(filename, (w, h))] = view[offset:offset + length]
+        else:
+            sounds[filename] = view[offset:offset + length]
+    return Bundle(images, sounds, (frequency, sample_format, channels), buffer)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pack images and sounds into one pre-converted bundle')
+    parser.add_argument('--out', default=BUNDLE_PATH)
+    args = parser.parse_args(argv)
+    count, size = build(args.out)
+    print(f"wrote {args.out}: {count} assets, {size // 1024} KiB (TILE_SIZE {s.TILE_SIZE})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+# camera.py
+# viewport onto a map that can be larger than the window
+# the view follows the players and is clamped to the map; everything drawn
+# is shifted by the camera offset, and only what overlaps the view is drawn
+
+import pygame
+import settings as s
+
+
+class Camera:
+    def __init__(self, world_rect, view_size=None):
+        if view_size is None:
+            view_size = s.SCREEN_SIZE
+        self.world = pygame.Rect(world_rect)
+        self.rect = pygame.Rect((0, 0), view_size) # visible part of the map, in map pixels
+        self.moved = False # the view scrolled since the last frame
+
+    # whole map fits in the window: no scrolling, no culling needed
+    @property
+    def fixed(self):
+        return self.rect.width >= self.world.width and self.rect.height >= self.world.height
+
+    # center on the live players (midpoint of both), keep the view on the map
+    def follow(self, targets):
+        rects = [target.rect for target in targets]
+        view = self.rect.copy()
+        if rects and not self.fixed:
+            view.center = (sum(rect.centerx for rect in rects) // len(rects),
+                           sum(rect.centery for rect in rects) // len(rects))
+            view.clamp_ip(self.world)
+        self.moved = view.topleft != self.rect.topleft
+        self.rect = view
+
+    # map position -> screen position
+    def apply(self, rect):
+        return rect.move(-self.rect.x, -self.rect.y)
+
+    def offset(self):
+        return -self.rect.x, -self.rect.y
@@ -0,0 +1,93 @@
+# grid.py
+# tile-grid index of the walls on the map
+# every wall occupies exactly one tile, so looking up what a rect touches
+# only needs the few tiles under it instead of testing the whole walls group
+
+import pygame
+import settings as s
+
+
+class WallGrid:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = [[None] * width for _ in range(height)]
+        self.bounds = pygame.Rect(0, 0, width * s.TILE_SIZE, height * s.TILE_SIZE) # map area in pixels
+        self.lookups = 0 # walls_in_rect/sweep calls, for telemetry
+
+    def add(self, wall):
+        tx, ty = wall.rect.x // s.TILE_SIZE, wall.rect.y // s.TILE_SIZE
+        self.cells[ty][tx] = wall
+
+    # called when a wall dies
+    def remove(self, wall):
+        tx, ty = wall.rect.x // s.TILE_SIZE, wall.rect.y // s.TILE_SIZE
+        if self.cells[ty][tx] is wall:
+            self.cells[ty][tx] = None
+
+    # wall at tile (tx, ty) or None, tiles outside the map are empty
+    def get(self, tx, ty):
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return self.cells[ty][tx]
+        return None
+
+    # all walls overlapping rect (usually 1-4 tiles for a tank)
+    def walls_in_rect(self, rect):
+        self.lookups += 1
+        x0 = max(rect.left // s.TILE_SIZE, 0)
+        y0 = max(rect.top // s.TILE_SIZE, 0)
+        x1 = min((rect.right - 1) // s.TILE_SIZE, self.width - 1)
+        y1 = min((rect.bottom - 1) // s.TILE_SIZE, self.height - 1)
+        hits = []
+        for ty in range(y0, y1 + 1):
+            row = self.cells[ty]
+            for tx in range(x0, x1 + 1):
+                if row[tx] is not None:
+                    hits.append(row[tx])
+        return hits
+
+    # True if a wall sits on any tile of column tx from row y0 to y1, or of
+    # row ty from column x0 to x1 (inclusive, tiles outside the map are empty)
+    def wall_in_column(self, tx, y0, y1):
+        self.lookups += 1
+        if 0 <= tx < self.width:
+            cells = self.cells
+            for ty in range(y0 if y0 > 0 else 0, y1 + 1 if y1 < self.height else self.height):
+                if cells[ty][tx] is not None:
+                    return True
+        return False
+
+    def wall_in_row(self, ty, x0, x1):
+        self.lookups += 1
+        if 0 <= ty < self.height and x1 >= 0:
+            for wall in self.cells[ty][x0 if x0 > 0 else 0:x1 + 1 if x1 < self.width else self.width]:
+                if wall is not None:
+                    return True
+        return False
+
+    # first wall touched by rect while it moves (dx, dy) along one axis
+    # walks the tiles row by row (or column by column) in travel order, so fast
+    # bullets can't tunnel through a wall between two frames
+    def sweep(self, rect, dx, dy):
+        self.lookups += 1
+        # bounds of the swept area, computed without building new Rects
+        left, top = rect.left + min(dx, 0), rect.top + min(dy, 0)
+        right, bottom = rect.right + max(dx, 0), rect.bottom + max(dy, 0)
+        x0, x1 = left // s.TILE_SIZE, (right - 1) // s.TILE_SIZE
+        y0, y1 = top // s.TILE_SIZE, (bottom - 1) // s.TILE_SIZE
+        # only tiles inside the map can hold a wall
+        cells, width, height = self.cells, self.width, self.height
+        cols = range(x0 if x0 > 0 else 0, x1 + 1 if x1 < width else width)
+        rows = range(y0 if y0 > 0 else 0, y1 + 1 if y1 < height else height)
+        if dy != 0:
+            for ty in (reversed(rows) if dy < 0 else rows):
+                row = cells[ty]
+                for tx in cols:
+                    if row[tx] is not None:
+                        return row[tx]
+        else:
+            for tx in (reversed(cols) if dx < 0 else cols):
+                for ty in rows:
+                    if cells[ty][tx] is not None:
+                        return cells[ty][tx]
+        return None
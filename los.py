@@ -0,0 +1,105 @@
+# los.py
+# line-of-sight index over the tile grid
+# every row and column is split into open spans between walls and each free
+# tile stores the id of its span, so "can A see B along this row/column" is a
+# single comparison. Bushes don't block sight, every wall (boss included) does.
+# The array engine reads the spans as NumPy arrays (span_arrays), which are
+# built once and then patched along with the lists.
+
+import settings as s
+
+BLOCKED = -1
+
+
+class SightLines:
+    def __init__(self, wall_grid):
+        self.width = wall_grid.width
+        self.height = wall_grid.height
+        self.next_id = 0
+        self.row_span = [[BLOCKED] * self.width for _ in range(self.height)]
+        self.col_span = [[BLOCKED] * self.width for _ in range(self.height)]
+        cells = wall_grid.cells
+        for ty in range(self.height):
+            span = None
+            for tx in range(self.width):
+                if cells[ty][tx] is not None:
+                    span = None
+                    continue
+                if span is None:
+                    span = self._new_id()
+                self.row_span[ty][tx] = span
+        for tx in range(self.width):
+            span = None
+            for ty in range(self.height):
+                if cells[ty][tx] is not None:
+                    span = None
+                    continue
+                if span is None:
+                    span = self._new_id()
+                self.col_span[ty][tx] = span
+        self.arrays = None # (row spans, col spans) as NumPy arrays, see span_arrays()
+
+    def snapshot(self):
+        return self.next_id, [row[:] for row in self.row_span], [row[:] for row in self.col_span]
+
+    def restore(self, snapshot):
+        self.next_id = snapshot[0]
+        self.row_span = [row[:] for row in snapshot[1]]
+        self.col_span = [row[:] for row in snapshot[2]]
+        if self.arrays is not None:
+            self.arrays[0][:] = self.row_span
+            self.arrays[1][:] = self.col_span
+
+    # numpy is only imported once something asks for the arrays
+    def span_arrays(self):
+        if self.arrays is None:
+            import numpy as np
+            self.arrays = (np.array(self.row_span, np.int32), np.array(self.col_span, np.int32))
+        return self.arrays
+
+    def _new_id(self):
+        self.next_id += 1
+        return self.next_id
+
+    # the wall at its tile is gone: the spans on both sides join up
+    def wall_removed(self, wall):
+        tx, ty = wall.rect.x // s.TILE_SIZE, wall.rect.y // s.TILE_SIZE
+        row = self.row_span[ty]
+        left = row[tx - 1] if tx > 0 else BLOCKED
+        span = left if left != BLOCKED else self._new_id()
+        row[tx] = span
+        x = tx + 1
+        while x < self.width and row[x] != BLOCKED:
+            row[x] = span
+            x += 1
+        if self.arrays is not None:
+            self.arrays[0][ty, tx:x] = span
+
+        cols = self.col_span
+        up = cols[ty - 1][tx] if ty > 0 else BLOCKED
+        span = up if up != BLOCKED else self._new_id()
+        cols[ty][tx] = span
+        y = ty + 1
+        while y < self.height and cols[y][tx] != BLOCKED:
+            cols[y][tx] = span
+            y += 1
+        if self.arrays is not None:
+            self.arrays[1][ty:y, tx] = span
+
+    def _span(self, spans, tx, ty):
+        if 0 <= tx < self.width and 0 <= ty < self.height:
+            return spans[ty][tx]
+        return BLOCKED
+
+    # direction to fire from tile a to hit tile b, None without a clear line
+    def line_of_fire(self, a, b):
+        (ax, ay), (bx, by) = a, b
+        if ay == by and ax != bx:
+            span = self._span(self.row_span, ax, ay)
+            if span != BLOCKED and span == self._span(self.row_span, bx, by):
+                return 'RIGHT' if bx > ax else 'LEFT'
+        elif ax == bx and ay != by:
+            span = self._span(self.col_span, ax, ay)
+            if span != BLOCKED and span == self._span(self.col_span, bx, by):
+                return 'DOWN' if by > ay else 'UP'
+        return None
@@ -1,31 +1,79 @@
 import pygame
 import sys
 import random
+import argparse
 import settings as s
 import map as m
-from sprites import HeroTank, Wall, Bush, Bullet, EnemyTank, load_sound, draw_text
+import mapfile
+from sprites import HeroTank, Wall, Bush, BulletGroup, BulletPool, EnemyTank, TextLabel, draw_text
+import assets
+import audio
+from terrain import TerrainLayer
+from camera import Camera
+from grid import WallGrid
+from broadphase import SpatialHash
+from simclock import WallClock, SimClock
+from pathfinding import PathPlanner, tile_of
+from los import SightLines
+import snapshot
+from rng import RandomStream
+from pipeline import RenderFrame
 
 
 class Game:
     """Main Game Class — controls the entire game loop and state"""
 
-    def __init__(self):
-        # Initialize pygame and mixer (for sounds)
-        pygame.init()
-        pygame.mixer.init()
-
-        # Set up the main window
-        self.screen = pygame.display.set_mode(s.SCREEN_SIZE)
-        pygame.display.set_caption(s.TITLE)
-
-        # Game clock for controlling FPS
-        self.clock = pygame.time.Clock()
+    def __init__(self, headless=False, clock=None, controller=None, engine=None, game_map=None):
+        # Headless games open no window, play no audio and never draw; the
+        # simulation steps on a fixed-timestep SimClock unless a clock is given
+        self.headless = headless
+        # controller(game, player) -> (direction or None, shoot) drives the
+        # players when there is no keyboard; idle players if None
+        self.controller = controller
+        # 'sprites' or 'numpy' (see settings.ENGINE)
+        self.engine_mode = engine or s.ENGINE
+        # Level to play: a map file path, a mapfile.GameMap, or the built-in
+        # map.MAP_DATA; compiled once here, new_game() only reads the result
+        if game_map is None:
+            game_map = mapfile.from_rows(m.MAP_DATA, m.PLAYER1_SPAWN, m.PLAYER2_SPAWN)
+        elif isinstance(game_map, str):
+            game_map = mapfile.load(game_map)
+        self.level = game_map
+        mapfile.apply_screen_size(self.level)
+
+        if not self.headless:
+            # Initialize pygame (the mixer is started by audio.create)
+            pygame.init()
+
+            # Set up the main window
+            self.screen = pygame.display.set_mode(s.SCREEN_SIZE)
+            pygame.display.set_caption(s.TITLE)
+        else:
+            self.screen = None
+
+        # Game clock for controlling FPS (all game timers read it too)
+        if clock is None:
+            clock = SimClock() if self.headless else WallClock()
+        self.clock = clock
+        self.broadphase = SpatialHash()  # tanks/bullets, rebuilt every tick
+        self.bullet_pool = BulletPool()  # dead bullets are reused for new shots
+        self.profiler = None  # optional FrameProfiler, timed sections call lap()
+        self.telemetry = None  # optional Telemetry (a FrameProfiler with overlay/export)
+        self.world_level = None  # map the current world was built from (see new_game)
+        self.recorder = None  # optional replay.Recorder logging every frame's inputs
+        self.pipeline = None  # pipeline.Pipeline while run() is pipelined
         self.running = True
 
-        # Load font (fallback to default if Consolas not found)
-        self.font_name = pygame.font.match_font('consolas')
-        if not self.font_name:
-            self.font_name = pygame.font.get_default_font()
+        if not self.headless:
+            # Load font (fallback to default if Consolas not found)
+            self.font_name = pygame.font.match_font('consolas')
+            if not self.font_name:
+                self.font_name = pygame.font.get_default_font()
+
+            # Retained HUD labels, re-rendered only when their value changes
+            self.label_p1_score = TextLabel(24, 100, 35, s.WHITE, self.font_name)
+            self.label_p2_score = TextLabel(24, s.SCREEN_WIDTH / 2, 35, s.WHITE, self.font_name)
+            self.label_enemies = TextLabel(24, s.SCREEN_WIDTH - 100, 35, s.WHITE, self.font_name)
 
         # Load game resources (sounds, etc.)
         self.load_data()
@@ -33,212 +81,502 @@ class Game:
 
     # Load sound and other resources
     def load_data(self):
-        self.sound_fire = load_sound(s.SND_FIRE)
-        self.sound_hit_iron = load_sound(s.SND_HIT_IRON)
-        self.sound_bang_enemy = load_sound(s.SND_BANG_ENEMY)
-        self.sound_bang_player = load_sound(s.SND_BANG_PLAYER)
+        assets.preload()  # decode and scale all images once, sprites share them
+        self.audio = audio.create(self.headless)  # no-op backend when headless
 
 
     # Start a new game session
-    def new_game(self):
+    # The world (sprites, wall grid, terrain, path/sight tables) is built once
+    # per map; later restarts put it back to its starting state in place
+    # seed picks the match's random streams, drawn from the global random
+    # module when not given (so random.seed() still fixes a whole match)
+    def new_game(self, seed=None):
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.spawn_rng = RandomStream(self.seed, 'spawn')  # enemy spawn tile, type and start state
+        self.ai_rng = RandomStream(self.seed, 'ai')  # enemy decisions during the match
+        if self.world_level is not self.level:
+            self.build_world()
+        else:
+            self.reset_world()
+
+        # Game state flags
+        self.playing = False  # set by run()
+        self.frame_count = 0
+        self.timed_out = False  # headless match stopped by max_frames
+        self.game_over = False
+        self.game_victory = False
+        self.winner = None  # Used for instant-death (boss kill) situations
+
+        self.prev_dirty = None  # rects drawn last frame, None forces a full redraw
+        self.terrain_dirty = []  # wall tiles cleared since the last frame
+        self.walls_removed = []  # destroyed walls still drawn in the terrain
+        # View onto the map, scrolls when the map is larger than the window
+        self.camera = Camera(self.wall_grid.bounds)
+        self.camera.follow(self.players)
+
+        # Optional array engine takes over enemies and bullets
+        self.engine = None
+        if self.engine_mode == 'numpy':
+            from soa import ArrayEngine  # numpy is only needed for this mode
+            self.engine = ArrayEngine(self)
+
+        if self.telemetry is not None:
+            self.telemetry.new_match()
+        if self.recorder is not None:
+            self.recorder.new_match(self)
+
+        # Enemy spawn management
+        self.enemies_spawned = 0
+        self.total_enemies_to_spawn = s.ENEMY_TOTAL_COUNT
+        for _ in range(s.ENEMY_START_COUNT):
+            self.spawn_enemy()
+
+    # Create every sprite and lookup table of the current map
+    def build_world(self):
+        level = self.level
         # Create sprite groups
         self.all_sprites = pygame.sprite.Group()
         self.walls = pygame.sprite.Group()
         self.bushes = pygame.sprite.Group()
         self.players = pygame.sprite.Group()
-        self.bullets = pygame.sprite.Group()
+        self.bullets = BulletGroup()
         self.enemies = pygame.sprite.Group()
         self.boss_group = pygame.sprite.Group()
-        self.enemy_spawn_tiles = []
-
-        # Game state flags
-        self.game_over = False
-        self.game_victory = False
-        self.winner = None  # Used for instant-death (boss kill) situations
-
-        # Build the map by reading data from m.MAP_DATA
-        for row_index, row in enumerate(m.MAP_DATA):
-            for col_index, tile in enumerate(row):
-                if tile == s.MAP_TILE_RED_WALL or tile == s.MAP_TILE_IRON_WALL:
-                    # Create normal or iron walls
-                    wall = Wall(col_index, row_index, tile)
-                    self.all_sprites.add(wall);
-                    self.walls.add(wall)
-                elif tile == s.MAP_TILE_BOSS:
-                    # Create boss tile (special wall)
-                    wall = Wall(col_index, row_index, tile)
-                    self.all_sprites.add(wall);
-                    self.walls.add(wall)
-                    self.boss_group.add(wall)
-                elif tile == s.MAP_TILE_BUSH:
-                    # Create bush (transparent terrain)
-                    bush = Bush(col_index, row_index)
-                    self.all_sprites.add(bush);
-                    self.bushes.add(bush)
-                elif tile == s.MAP_TILE_EMPTY:
-                    # Empty tile — may be used for enemy spawn
-                    if row_index > 2 and row_index < 22:
-                        self.enemy_spawn_tiles.append((col_index, row_index))
+        self.enemy_spawn_tiles = list(level.spawn_tiles)  # precomputed when the map was compiled
+        self.wall_grid = WallGrid(level.width, level.height)  # tile -> wall lookup
+
+        # Build the map from the compiled wall/bush list
+        for col_index, row_index, tile in level.iter_objects():
+            if tile == s.MAP_TILE_RED_WALL or tile == s.MAP_TILE_IRON_WALL:
+                # Create normal or iron walls
+                wall = Wall(col_index, row_index, tile)
+                self.all_sprites.add(wall);
+                self.walls.add(wall)
+                self.wall_grid.add(wall)
+            elif tile == s.MAP_TILE_BOSS:
+                # Create boss tile (special wall)
+                wall = Wall(col_index, row_index, tile)
+                self.all_sprites.add(wall);
+                self.walls.add(wall)
+                self.wall_grid.add(wall)
+                self.boss_group.add(wall)
+            elif tile == s.MAP_TILE_BUSH:
+                # Create bush (transparent terrain)
+                bush = Bush(col_index, row_index)
+                self.all_sprites.add(bush);
+                self.bushes.add(bush)
+
+        # Bake walls and bushes into cached layers (redrawn only when a wall dies)
+        self.terrain = None if self.headless else TerrainLayer(self.walls, self.bushes)
+
+        # Shared flow fields the enemy AI follows toward players and the boss
+        self.pathing = PathPlanner(self.wall_grid, self.boss_group)
+        # Row/column spans between walls for O(1) line-of-sight checks
+        self.sight = SightLines(self.wall_grid)
 
         # Spawn players
-        self.player1 = HeroTank(m.PLAYER1_SPAWN[0], m.PLAYER1_SPAWN[1], 1, self)
-        self.player2 = HeroTank(m.PLAYER2_SPAWN[0], m.PLAYER2_SPAWN[1], 2, self)
+        self.player1 = HeroTank(level.player1_spawn[0], level.player1_spawn[1], 1, self)
+        self.player2 = HeroTank(level.player2_spawn[0], level.player2_spawn[1], 2, self)
         self.all_sprites.add(self.player1);
         self.all_sprites.add(self.player2)
         self.players.add(self.player1);
         self.players.add(self.player2)
 
-        # Enemy spawn management
-        self.enemies_spawned = 0
-        self.total_enemies_to_spawn = s.ENEMY_TOTAL_COUNT
-        for _ in range(s.ENEMY_START_COUNT):
-            self.spawn_enemy()
+        # Starting state that reset_world() goes back to
+        self.wall_list = self.walls.sprites()
+        self.world_snapshot = ([wall.health for wall in self.wall_list],
+                               self.pathing.snapshot(), self.sight.snapshot())
+        self.world_level = level
+
+    # Put the world built by build_world() back to the start of a match
+    def reset_world(self):
+        for bullet in self.bullets.sprites():
+            bullet.kill()  # back to the pool
+        for enemy in self.enemies.sprites():
+            enemy.kill()
+
+        wall_health, pathing, sight = self.world_snapshot
+        for wall, health in zip(self.wall_list, wall_health):
+            wall.health = health
+            if not wall.alive():
+                self.all_sprites.add(wall)
+                self.walls.add(wall)
+                self.wall_grid.add(wall)
+                if self.terrain is not None:
+                    self.terrain.restore_wall(wall)
+            if wall.wall_type == s.MAP_TILE_BOSS:
+                self.boss_group.add(wall)  # emptied when the boss is shot
+        self.pathing.restore(pathing)
+        self.sight.restore(sight)
+
+        self.players.empty()  # re-added in order, the AI iterates this group
+        for player in (self.player1, self.player2):
+            player.reset()
+            self.all_sprites.add(player)
+            self.players.add(player)
+
+    # Full simulation state as compact bytes, cheap enough to take every frame
+    # (rollback, instant replays, bug reports); see snapshot.py
+    def snapshot(self):
+        return snapshot.save(self)
+
+    # Go back to a state from snapshot() taken on this map
+    def restore(self, data):
+        snapshot.load(self, data)
+
+    # Record every match's seed and inputs for replay.py (saved to path when
+    # a match ends, later matches get a number added)
+    def enable_recording(self, path=None):
+        from replay import Recorder
+        self.recorder = Recorder(path)
+
+    # Turn on frame telemetry (overlay + optional CSV/JSONL export at path)
+    def enable_telemetry(self, path=None):
+        from telemetry import Telemetry
+        self.telemetry = Telemetry(self, path)
+        self.profiler = self.telemetry
 
     # Spawn a new enemy if conditions allow
     def spawn_enemy(self):
         if self.enemies_spawned >= self.total_enemies_to_spawn: return
-        if len(self.enemies) >= s.ENEMY_MAX_ON_SCREEN: return
+        if self.enemy_count() >= s.ENEMY_MAX_ON_SCREEN: return
         if not self.enemy_spawn_tiles: return
 
-        spawn_pos = random.choice(self.enemy_spawn_tiles)
-        enemy = EnemyTank(spawn_pos[0], spawn_pos[1], self)
-        self.all_sprites.add(enemy);
-        self.enemies.add(enemy)
+        spawn_pos = self.spawn_rng.choice(self.enemy_spawn_tiles)
+        if self.engine is not None:
+            self.engine.spawn_enemy(spawn_pos[0], spawn_pos[1])
+        else:
+            enemy = EnemyTank(spawn_pos[0], spawn_pos[1], self)
+            self.all_sprites.add(enemy);
+            self.enemies.add(enemy)
         self.enemies_spawned += 1
 
+    # Enemies currently on the map
+    def enemy_count(self):
+        if self.engine is not None:
+            return self.engine.enemy_count
+        return len(self.enemies)
+
+    # Fire a bullet from (x, y) (tanks call this from shoot())
+    def add_bullet(self, x, y, direction, owner):
+        if self.engine is not None:
+            self.engine.add_bullet(x, y, direction, owner)
+            return
+        bullet = self.bullet_pool.acquire(x, y, direction, owner)
+        self.bullets.add(bullet)
+
+
+    # Direction an enemy on tile should fire to hit a living player, or None
+    def line_of_fire(self, tile):
+        for player in (self.player1, self.player2):
+            if player.alive():
+                direction = self.sight.line_of_fire(tile, tile_of(player.rect))
+                if direction is not None:
+                    return direction
+        return None
+
+
+    # Remove a wall from the world and invalidate its tile in the terrain layer
+    def destroy_wall(self, wall):
+        wall.kill()
+        self.wall_grid.remove(wall)
+        self.pathing.wall_removed(wall)
+        self.sight.wall_removed(wall)
+        if self.engine is not None:
+            self.engine.wall_removed(wall)
+        if self.terrain is not None:
+            self.walls_removed.append(wall)  # draw() clears the tile
+
+    # Apply a bullet hitting a wall (the caller removes the bullet)
+    # Returns True if the hit ended the match (boss shot by a player)
+    def bullet_hits_wall(self, owner, wall):
+        if wall.wall_type == s.MAP_TILE_IRON_WALL:
+            # Iron walls are indestructible
+            self.audio.play('hit_iron')
+        elif wall.wall_type == s.MAP_TILE_RED_WALL:
+            # Red walls take damage and can be destroyed
+            wall.health -= 1
+            if wall.health <= 0: self.destroy_wall(wall)
+        elif wall.wall_type == s.MAP_TILE_BOSS:
+            # (New) Boss instant-death rule
+            if owner == 'Enemy':
+                return False  # Enemy bullets don't affect boss
+            if owner == 'P1':
+                print("Player 1 shot the boss! Player 2 wins!")
+                self.winner = 'P2'
+            elif owner == 'P2':
+                print("Player 2 shot the boss! Player 1 wins!")
+                self.winner = 'P1'
+            self.game_over = True;
+            self.playing = False
+            self.destroy_wall(wall)
+            self.boss_group.empty()
+            return True
+        return False
+
+    # An enemy was destroyed by killer ('P1' or 'P2')
+    def enemy_killed(self, killer):
+        self.audio.play('bang_enemy')
+        # Reward player with score and heal
+        if killer == 'P1':
+            self.player1.score += 1
+            self.player1.heal(s.PLAYER_HEAL_ON_KILL)
+        elif killer == 'P2':
+            self.player2.score += 1
+            self.player2.heal(s.PLAYER_HEAL_ON_KILL)
+        self.spawn_enemy()
+
 
     # Main game loop
-    def run(self):
+    # max_frames stops a headless match that would otherwise never end
+    def run(self, max_frames=None):
         self.playing = True
+        if s.PIPELINED_RENDERING and not self.headless:
+            # Simulation on a second thread, drawing here (see pipeline.py)
+            from pipeline import Pipeline
+            Pipeline(self).run(max_frames)
         while self.playing:
-            self.clock.tick(s.FPS)  # Maintain frame rate
-            self.events()  # Handle inputs/events
-            self.update()  # Update game logic
-            self.draw()  # Render everything
+            self.step(max_frames)
+            if not self.headless:
+                self.draw()  # Render everything
+                if self.profiler: self.profiler.lap('draw')
+            if self.profiler: self.profiler.end_frame()
+
 
-        if not self.running:
+        if self.recorder is not None:
+            self.recorder.end_match(self)
+
+        # No end screen without a human at the keyboard to dismiss it
+        if not self.running or self.headless or self.controller is not None:
             return
 
         self.show_game_over_screen()
 
-    # Event handling (keyboard, quit, etc.)
-    def events(self):
+    # One tick of the simulation: clock, inputs, game logic
+    # (the caller ends the profiler frame)
+    def step(self, max_frames=None):
+        self.begin_step()
+        self.update()  # Update game logic
+        self.end_step(max_frames)
+
+    # step() split around update(), so vecenv.py can update many games'
+    # players and then their batched array engine in between
+    def begin_step(self):
+        self.clock.tick(s.FPS)  # Maintain frame rate (fixed step when headless)
+        if self.profiler: self.profiler.begin_frame()
+        self.events()  # Handle inputs/events
+        if self.profiler: self.profiler.lap('events')
+
+    def end_step(self, max_frames=None):
+        if self.profiler: self.profiler.lap('update.other')
+        self.frame_count += 1
+        if max_frames is not None and self.frame_count >= max_frames and self.playing:
+            self.timed_out = True
+            self.playing = False
+
+    # Window events (quit, overlay key); returns the shoot presses (P1, P2)
+    def poll_events(self):
+        shots = [False, False]
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 if self.playing: self.playing = False
                 self.running = False
+            if event.type == pygame.KEYDOWN and event.key == s.TELEMETRY_OVERLAY_KEY and self.telemetry:
+                self.telemetry.toggle_overlay()
+            if self.controller is not None:
+                continue  # players are not on the keyboard
             if event.type == pygame.KEYDOWN:
-                if event.key == s.P1_SHOOT: self.player1.shoot()
+                if event.key == s.P1_SHOOT: shots[0] = True
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left mouse button
-                    self.player2.shoot()
+                    shots[1] = True
+        return shots
 
-        # Get player movement input continuously
-        self.player1.get_input()
-        self.player2.get_input()
+    # Event handling (keyboard, quit, etc.)
+    def events(self):
+        players = (self.player1, self.player2)
+        if self.pipeline is not None:
+            # The main thread owns the window and collected the inputs
+            inputs = self.pipeline.take_inputs(self, players)
+        elif self.headless or self.controller is not None:
+            # Inputs come from the controller instead of the keyboard
+            if not self.headless:
+                self.poll_events()  # quit and overlay keys still work
+            inputs = [self.controller(self, player) if self.controller else (None, False) for player in players]
+        else:
+            # Get player movement input continuously
+            shots = self.poll_events()  # shoot presses this frame (P1, P2)
+            inputs = [(player.get_input(), shoot) for player, shoot in zip(players, shots)]
+
+        # (direction, shoot) per player is all the simulation gets from outside
+        for player, (direction, shoot) in zip(players, inputs):
+            if shoot: player.shoot()
+            player.steer(direction)
+        if self.recorder is not None:
+            self.recorder.record(self, inputs)
 
     # Update game logic (collision, status, etc.)
     def update(self):
-        # Update movement and interactions
-        self.players.update(self.walls)
-        self.enemies.update(self.walls)
-        self.bullets.update()
-
-        # (1) Bullet vs Wall collisions
-        hits = pygame.sprite.groupcollide(self.bullets, self.walls, False, False)
-        for bullet, hit_walls in hits.items():
-            wall = hit_walls[0]
-            if wall.wall_type == s.MAP_TILE_IRON_WALL:
-                # Iron walls are indestructible
-                bullet.kill();
-                self.sound_hit_iron.play()
-            elif wall.wall_type == s.MAP_TILE_RED_WALL:
-                # Red walls take damage and can be destroyed
-                bullet.kill();
-                wall.health -= 1
-                if wall.health <= 0: wall.kill()
-            elif wall.wall_type == s.MAP_TILE_BOSS:
-                # (New) Boss instant-death rule
-                if bullet.owner == 'Enemy':
-                    bullet.kill()  # Enemy bullets don't affect boss
-                elif bullet.owner == 'P1':
-                    print("Player 1 shot the boss! Player 2 wins!")
-                    self.game_over = True;
-                    self.playing = False
-                    self.winner = 'P2'
-                    bullet.kill();
-                    wall.kill();
-                    self.boss_group.empty()
-                    return
-                elif bullet.owner == 'P2':
-                    print("Player 2 shot the boss! Player 1 wins!")
-                    self.game_over = True;
-                    self.playing = False
-                    self.winner = 'P1'
-                    bullet.kill();
-                    wall.kill();
-                    self.boss_group.empty()
-                    return
-
-        # (2) Bullet vs Player
-        hits = pygame.sprite.groupcollide(self.players, self.bullets, False, False)
-        for player, bullets_hit in hits.items():
-            for bullet in bullets_hit:
-                if bullet.owner != f"P{player.player_num}":
-                    player.take_damage(1, bullet.owner)
-                    bullet.kill()
-
-        # (3) Bullet vs Enemy
-        hits = pygame.sprite.groupcollide(self.enemies, self.bullets, False, False)
-        for enemy, bullets_hit in hits.items():
-            for bullet in bullets_hit:
-                if bullet.owner != 'Enemy':
-                    killer = enemy.take_damage(1, bullet.owner)
-                    bullet.kill()
-                    if killer:
-                        self.sound_bang_enemy.play()
-                        # Reward player with score and heal
-                        if killer == 'P1':
-                            self.player1.score += 1
-                            self.player1.heal(s.PLAYER_HEAL_ON_KILL)
-                        elif killer == 'P2':
-                            self.player2.score += 1
-                            self.player2.heal(s.PLAYER_HEAL_ON_KILL)
-                        self.spawn_enemy()
-
-        # (4) Check victory condition
-        if self.enemies_spawned == self.total_enemies_to_spawn and not self.enemies:
+        self.update_players()
+        if self.engine is not None:
+            # Array engine moves enemies/bullets and resolves their hits in batches
+            self.engine.update()
+            if self.profiler: self.profiler.lap('update.engine')
+        else:
+            self.update_sprites()
+        self.check_victory()
+
+    # Update movement and interactions
+    def update_players(self):
+        self.players.update(self.wall_grid)
+        self.pathing.update(self.clock.get_ticks(), self.players)
+        if self.profiler: self.profiler.lap('update.players')
+
+    # (4) Check victory condition
+    def check_victory(self):
+        if self.playing and self.enemies_spawned == self.total_enemies_to_spawn and not self.enemy_count():
             self.game_victory = True
             self.playing = False
 
+    # Enemy and bullet update for the default sprite engine
+    def update_sprites(self):
+        prof = self.profiler
+        self.enemies.update(self.wall_grid)
+        if prof: prof.lap('update.enemies')
+        self.bullets.update(self.wall_grid)
+        if prof: prof.lap('update.bullets')
+
+        # (1) Bullet vs Wall collisions (found by each bullet's grid sweep)
+        hits = [bullet for bullet in self.bullets if bullet.hit_wall is not None]
+        for bullet in hits:
+            bullet.kill()
+            if self.bullet_hits_wall(bullet.owner, bullet.hit_wall):
+                return
+        if prof: prof.lap('update.bullet_wall')
+
+        # Broadphase: every overlapping tank/bullet pair with different owners
+        player_hits = []
+        enemy_hits = []
+        for tank, bullet in self.broadphase.bullet_pairs((self.players, self.enemies), self.bullets):
+            if tank in self.players:
+                player_hits.append((tank, bullet))
+            else:
+                enemy_hits.append((tank, bullet))
+        if prof: prof.lap('update.broadphase')
 
-    # Draw all visual elements
-
-    def draw(self):
-        self.screen.fill(s.BLACK)
+        # (2) Bullet vs Player
+        for player, bullet in player_hits:
+            if bullet.alive():
+                player.take_damage(1, bullet.owner)
+                bullet.kill()
+        if prof: prof.lap('update.bullet_player')
 
-        # Draw sprites except bushes (draw them later to layer on top)
-        for sprite in self.all_sprites:
-            if sprite not in self.bushes:
-                self.screen.blit(sprite.image, sprite.rect)
+        # (3) Bullet vs Enemy
+        for enemy, bullet in enemy_hits:
+            if bullet.alive() and enemy.alive():
+                killer = enemy.take_damage(1, bullet.owner)
+                bullet.kill()
+                if killer:
+                    self.enemy_killed(killer)
+        if prof: prof.lap('update.bullet_enemy')
+
+
+    # Everything draw() needs from the simulation, as plain values taken at
+    # the end of a tick (pipelined mode draws it while the next tick runs)
+    def render_frame(self):
+        camera = self.camera
+        camera.follow(self.players)
+        offset = camera.offset()
+
+        # Moving sprites only; walls and bushes are baked into the terrain
+        players, enemies, bullets = self.visible_sprites()
+        sprites = [(sprite.image, sprite.rect.move(offset)) for sprite in players]
+        if self.engine is not None:
+            sprites += self.engine.blits(camera.rect)
+        else:
+            sprites += [(sprite.image, sprite.rect.move(offset)) for sprite in enemies]
+            sprites += [(sprite.image, sprite.rect.move(offset)) for sprite in bullets]
+        bars = [player.ui(offset) for player in players]
+
+        enemies_left = self.total_enemies_to_spawn - self.enemies_spawned + self.enemy_count()
+        hud = (self.player1.score, self.player2.score, enemies_left)
+        walls_removed, self.walls_removed = self.walls_removed, []
+        return RenderFrame(self.frame_count, camera.rect.copy(), camera.moved, sprites, bars, hud, walls_removed)
+
+    # Draw all visual elements (of frame, or of the game as it is now)
+
+    def draw(self, frame=None):
+        if frame is None:
+            frame = self.render_frame()
+        view = frame.view
+        for wall in frame.walls_removed:
+            self.terrain.remove_wall(wall)
+            self.terrain_dirty.append(wall.rect.move(-view.x, -view.y))
+
+        # In dirty-rect mode only the areas covered last frame and the tiles of
+        # destroyed walls are restored; the first frame of a match (or after a
+        # full redraw) repaints everything, and so does any frame the camera scrolled
+        dirty_mode = s.DIRTY_RECT_RENDERING and self.prev_dirty is not None and not frame.scrolled
+        if dirty_mode:
+            erased = self.prev_dirty + self.terrain_dirty
+            for rect in erased:
+                self.terrain.draw_base(self.screen, view, rect)
+        else:
+            # Cached wall layer replaces clearing the screen and re-blitting every tile
+            self.terrain.draw_base(self.screen, view)
+
+        drawn = self.screen.blits(frame.sprites)
 
         # Draw player UI (health, score, etc.)
-        if self.player1.alive():
-            self.player1.draw_ui(self.screen)
-        if self.player2.alive():
-            self.player2.draw_ui(self.screen)
+        for bar, x, y, hp in frame.bars:
+            drawn.append(bar.draw(self.screen, x, y, hp))
 
         # Draw bushes last for visual cover effect
-        for bush in self.bushes:
-            self.screen.blit(bush.image, bush.rect)
+        if dirty_mode:
+            for rect in drawn + erased:
+                self.terrain.draw_overlay(self.screen, view, rect)
+        else:
+            self.terrain.draw_overlay(self.screen, view)
 
         # On-screen text UI
-        draw_text(self.screen, f"P1 Score: {self.player1.score}", 24, 100, 35, s.WHITE, self.font_name)
-        draw_text(self.screen, f"P2 Score: {self.player2.score}", 24, s.SCREEN_WIDTH / 2, 35, s.WHITE, self.font_name)
-        enemies_left = self.total_enemies_to_spawn - self.enemies_spawned + len(self.enemies)
-        draw_text(self.screen, f"Enemies: {enemies_left}", 24, s.SCREEN_WIDTH - 100, 35, s.WHITE, self.font_name)
-
-        pygame.display.flip()
+        p1_score, p2_score, enemies_left = frame.hud
+        self.label_p1_score.set_text(f"P1 Score: {p1_score}")
+        self.label_p2_score.set_text(f"P2 Score: {p2_score}")
+        self.label_enemies.set_text(f"Enemies: {enemies_left}")
+        drawn.append(self.label_p1_score.draw(self.screen))
+        drawn.append(self.label_p2_score.draw(self.screen))
+        drawn.append(self.label_enemies.draw(self.screen))
+        if self.telemetry is not None:
+            drawn += self.telemetry.draw_overlay(self.screen)
+
+        if dirty_mode:
+            # Push only what changed: last frame's rects and cleared wall tiles
+            # (now erased) and this frame's rects
+            pygame.display.update(erased + drawn)
+        else:
+            pygame.display.flip()
+        self.prev_dirty = drawn
+        self.terrain_dirty = []
+
+
+    # Players, enemies and bullets overlapping the camera view; on a scrolling
+    # map the enemies and bullets come from the broadphase cells
+    def visible_sprites(self):
+        if self.camera.fixed:
+            return self.players, self.enemies, self.bullets
+        view = self.camera.rect
+        players = [player for player in self.players if view.colliderect(player.rect)]
+        enemies, bullets = [], []
+        if self.engine is None:
+            self.broadphase.rebuild((self.players, self.enemies), self.bullets)
+            for sprite, is_bullet in self.broadphase.query(view):
+                if not sprite.alive() or not view.colliderect(sprite.rect):
+                    continue
+                if is_bullet:
+                    bullets.append(sprite)
+                elif sprite.owner == 'Enemy':
+                    enemies.append(sprite)
+        return players, enemies, bullets
 
 
     # Game Over / Victory screen
@@ -274,17 +612,19 @@ class Game:
             elif self.winner == 'P2':
                 winner_text = "Player 2 Wins!"
 
-        # (5) Collision: Player vs Enemy
-        for enemy in self.enemies:
-            # Player 1 collision
-            if pygame.sprite.collide_rect(enemy, self.player1):
-                self.player1.take_damage(1, 'Enemy')
-                enemy.take_damage(1, 'P1')
-
-            # Player 2 collision
-            if pygame.sprite.collide_rect(enemy, self.player2):
-                self.player2.take_damage(1, 'Enemy')
-                enemy.take_damage(1, 'P2')
+        # (5) Collision: Player vs Enemy (tank pairs from the broadphase)
+        if self.engine is not None:
+            for player in (self.player1, self.player2):
+                for index in self.engine.enemies_touching(player.rect):
+                    player.take_damage(1, 'Enemy')
+                    self.engine.damage_enemy(index, 1, player.owner)
+            self.engine.remove_dead_enemies()
+        self.broadphase.rebuild((self.enemies, self.players))
+        for enemy, player in self.broadphase.pairs():
+            if enemy.owner != 'Enemy' or player.owner == 'Enemy':
+                continue
+            player.take_damage(1, 'Enemy')
+            enemy.take_damage(1, player.owner)
 
         # Draw title and scores
         draw_text(self.screen, title_text, 64, s.SCREEN_WIDTH / 2, s.SCREEN_HEIGHT / 4, title_color, self.font_name)
@@ -315,10 +655,48 @@ class Game:
 
 # Game launcher (entry point)
 
-g = Game()
-while g.running:
-    g.new_game()
-    g.run()
-
-pygame.quit()
-sys.exit()
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=s.TITLE)
+    parser.add_argument('--headless', action='store_true',
+                        help='simulate one match without window or audio, as fast as possible')
+    parser.add_argument('--max-frames', type=int, default=s.FPS * 60 * 5,
+                        help='frame limit for a headless match (default: 5 minutes of game time)')
+    parser.add_argument('--telemetry', metavar='FILE', nargs='?', const='',
+                        help='record frame telemetry (F3 shows the overlay); '
+                             'FILE ending in .csv or .jsonl is written in the background')
+    parser.add_argument('--record', metavar='FILE',
+                        help='record seed and inputs of each match for replay.py')
+    parser.add_argument('--map', metavar='FILE',
+                        help='play a map file (text or .tmap, see resources/maps/stock.txt)')
+    parser.add_argument('--pipelined', action='store_true',
+                        help='simulate on a second thread while the last tick is drawn')
+    args = parser.parse_args()
+    if args.pipelined:
+        s.PIPELINED_RENDERING = True
+
+    if args.headless:
+        g = Game(headless=True, game_map=args.map)
+        if args.telemetry is not None:
+            g.enable_telemetry(args.telemetry or None)
+        if args.record:
+            g.enable_recording(args.record)
+        g.new_game()
+        g.run(max_frames=args.max_frames)
+        if g.telemetry: g.telemetry.close()
+        print(f"frames={g.frame_count} victory={g.game_victory} game_over={g.game_over} "
+              f"winner={g.winner} timed_out={g.timed_out} "
+              f"p1_score={g.player1.score} p2_score={g.player2.score}")
+        sys.exit()
+
+    g = Game(game_map=args.map)
+    if args.telemetry is not None:
+        g.enable_telemetry(args.telemetry or None)
+    if args.record:
+        g.enable_recording(args.record)
+    while g.running:
+        g.new_game()
+        g.run()
+
+    if g.telemetry: g.telemetry.close()
+    pygame.quit()
+    sys.exit()
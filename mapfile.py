@@ -0,0 +1,226 @@
+# mapfile.py
+# maps on disk and their compiled cache
+#
+# source formats:
+#   text (.txt)   - one row of tile digits per line (spaces/commas allowed),
+#                   plus "P1 x y" / "P2 x y" spawn lines and "#" comments
+#   binary (.tmap) - MAP_HEADER followed by width*height tile bytes
+#
+# every source is compiled once into a .tmapc file in CACHE_DIR (named after
+# the source file and a hash of its path) holding the packed tile grid, the
+# enemy spawn tiles and the rects of every wall/bush.
+# Loading a map memory-maps that file, so starting or switching maps doesn't
+# parse or rescan the source. The cache is rebuilt when the source file
+# (size, mtime) or TILE_SIZE changes.
+
+import hashlib
+import mmap
+import os
+import struct
+import settings as s
+
+MAP_DIR = os.path.join(s.RESOURCE_DIR, 'maps')
+CACHE_DIR = os.path.join(MAP_DIR, '.cache')
+
+# magic, width, height, p1 x/y, p2 x/y
+MAP_HEADER = struct.Struct('<8sHHHHHH')
+MAP_MAGIC = b'TWMAP\x001\x00'
+# magic, source size, source mtime_ns, tile size, width, height, p1 x/y, p2 x/y,
+# spawn tile count, object count
+COMPILED_HEADER = struct.Struct('<8sqqIHHHHHHII')
+COMPILED_MAGIC = b'TWMAPC2\x00'
+OBJECT_FIELDS = 5 # x, y, w, h, tile type (int32 each)
+
+# tiles that become Wall or Bush objects
+OBJECT_TILES = (s.MAP_TILE_RED_WALL, s.MAP_TILE_IRON_WALL, s.MAP_TILE_BOSS, s.MAP_TILE_BUSH)
+
+
+class GameMap:
+    def __init__(self, width, height, tiles, player1_spawn, player2_spawn, spawn_tiles, objects, buffer=None):
+        self.width = width
+        self.height = height
+        self.tiles = tiles # packed row-major bytes (or memoryview), one byte per tile
+        self.player1_spawn = player1_spawn
+        self.player2_spawn = player2_spawn
+        self.spawn_tiles = spawn_tiles # [(x, y)] free tiles enemies may spawn on
+        self.objects = objects # flat int32 sequence, OBJECT_FIELDS per wall/bush
+        self._buffer = buffer # keeps the mmap alive
+
+    def tile(self, x, y):
+        return self.tiles[y * self.width + x]
+
+    def rows(self):
+        return [list(self.tiles[y * self.width:(y + 1) * self.width]) for y in range(self.height)]
+
+    # (tile x, tile y, tile type) for every wall and bush
+    def iter_objects(self):
+        objects = self.objects
+        for i in range(0, len(objects), OBJECT_FIELDS):
+            yield objects[i] // s.TILE_SIZE, objects[i + 1] // s.TILE_SIZE, objects[i + 4]
+
+    @property
+    def pixel_size(self):
+        return self.width * s.TILE_SIZE, self.height * s.TILE_SIZE
+
+
+# build a GameMap in memory from a list of rows (e.g. map.MAP_DATA)
+def from_rows(rows, player1_spawn, player2_spawn):
+    width, height = len(rows[0]), len(rows)
+    tiles = bytes(tile for row in rows for tile in row)
+    spawn_tiles, objects = _scan(tiles, width, height)
+    return GameMap(width, height, tiles, tuple(player1_spawn), tuple(player2_spawn), spawn_tiles, objects)
+
+
+# the per-cell scan Game.new_game used to do on every restart
+def _scan(tiles, width, height):
+    spawn_tiles = []
+    objects = []
+    t = s.TILE_SIZE
+    for y in range(height):
+        for x in range(width):
+            tile = tiles[y * width + x]
+            if tile in OBJECT_TILES:
+                objects.extend((x * t, y * t, t, t, tile))
+            elif tile == s.MAP_TILE_EMPTY:
+                # Empty tile — may be used for enemy spawn, away from the top
+                # border and the bottom rows where the players start
+                if y > 2 and y < height - 4:
+                    spawn_tiles.append((x, y))
+    return spawn_tiles, objects
+
+
+def parse_text(text):
+    rows, spawns = [], {}
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        if line[:2] in ('P1', 'P2'):
+            _, x, y = line.split()
+            spawns[line[:2]] = (int(x), int(y))
+            continue
+        rows.append([int(c) for c in line if c.isdigit()])
+    if not rows or any(len(row) != len(rows[0]) for row in rows):
+        raise ValueError("map rows must all have the same length")
+    if 'P1' not in spawns or 'P2' not in spawns:
+        raise ValueError("map needs 'P1 x y' and 'P2 x y' spawn lines")
+    return rows, spawns['P1'], spawns['P2']
+
+
+def format_text(rows, player1_spawn, player2_spawn):
+    lines = [f"P1 {player1_spawn[0]} {player1_spawn[1]}", f"P2 {player2_spawn[0]} {player2_spawn[1]}"]
+    lines += [''.join(str(tile) for tile in row) for row in rows]
+    return '\n'.join(lines) + '\n'
+
+
+def parse_binary(data):
+    magic, width, height, p1x, p1y, p2x, p2y = MAP_HEADER.unpack_from(data)
+    if magic != MAP_MAGIC:
+        raise ValueError("not a Tank War binary map")
+    tiles = data[MAP_HEADER.size:MAP_HEADER.size + width * height]
+    rows = [list(tiles[y * width:(y + 1) * width]) for y in range(height)]
+    return rows, (p1x, p1y), (p2x, p2y)
+
+
+def format_binary(rows, player1_spawn, player2_spawn):
+    header = MAP_HEADER.pack(MAP_MAGIC, len(rows[0]), len(rows), *player1_spawn, *player2_spawn)
+    return header + bytes(tile for row in rows for tile in row)
+
+
+def read_source(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data.startswith(MAP_MAGIC):
+        return parse_binary(data)
+    return parse_text(data.decode('utf-8'))
+
+
+def save(path, rows, player1_spawn, player2_spawn):
+    if path.endswith('.tmap'):
+        data = format_binary(rows, player1_spawn, player2_spawn)
+    else:
+        data = format_text(rows, player1_spawn, player2_spawn).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _align(offset):
+    return (offset + 3) & ~3
+
+
+# maps with the same file name in different folders get their own cache
+def cache_path(path, cache_dir=None):
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    name = f"{os.path.splitext(os.path.basename(path))[0]}-{digest}.tmapc"
+    return os.path.join(cache_dir or CACHE_DIR, name)
+
+
+# write the compiled artifact for a source map
+def compile_map(path, out_path):
+    st = os.stat(path)
+    game_map = from_rows(*read_source(path))
+    w, h = game_map.width, game_map.height
+    header = COMPILED_HEADER.pack(COMPILED_MAGIC, st.st_size, st.st_mtime_ns, s.TILE_SIZE, w, h,
+                                  *game_map.player1_spawn, *game_map.player2_spawn,
+                                  len(game_map.spawn_tiles), len(game_map.objects) // OBJECT_FIELDS)
+    body = bytearray(header)
+    body += game_map.tiles
+    body += bytes(_align(len(body)) - len(body))
+    body += struct.pack(f'<{2 * len(game_map.spawn_tiles)}H', *(v for tile in game_map.spawn_tiles for v in tile))
+    body += bytes(_align(len(body)) - len(body))
+    body += struct.pack(f'<{len(game_map.objects)}i', *game_map.objects)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, out_path)
+
+
+def _is_current(header, path):
+    st = os.stat(path)
+    magic, size, mtime, tile_size = header[:4]
+    return magic == COMPILED_MAGIC and size == st.st_size and mtime == st.st_mtime_ns and tile_size == s.TILE_SIZE
+
+
+# memory-map a compiled map, tiles/objects are views into the mapping
+def open_compiled(compiled_path):
+    with open(compiled_path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header = COMPILED_HEADER.unpack_from(buffer)
+    _, _, _, _, w, h, p1x, p1y, p2x, p2y, n_spawn, n_objects = header
+    view = memoryview(buffer)
+    offset = COMPILED_HEADER.size
+    tiles = view[offset:offset + w * h]
+    offset = _align(offset + w * h)
+    spawn = view[offset:offset + 4 * n_spawn].cast('H')
+    spawn_tiles = [(spawn[i], spawn[i + 1]) for i in range(0, len(spawn), 2)]
+    offset = _align(offset + 4 * n_spawn)
+    objects = view[offset:offset + 4 * OBJECT_FIELDS * n_objects].cast('i')
+    return header, GameMap(w, h, tiles, (p1x, p1y), (p2x, p2y), spawn_tiles, objects, buffer)
+
+
+# load a map file (text or binary), compiling it on first use
+# the header is checked before mapping: a stale cache is never mapped, since
+# Windows can't replace a file that is still mapped
+def load(path, cache_dir=None):
+    compiled = cache_path(path, cache_dir)
+    if os.path.exists(compiled):
+        with open(compiled, 'rb') as f:
+            data = f.read(COMPILED_HEADER.size)
+        if len(data) == COMPILED_HEADER.size and _is_current(COMPILED_HEADER.unpack(data), path):
+            return open_compiled(compiled)[1]
+    try:
+        compile_map(path, compiled)
+    except PermissionError:
+        # another live GameMap still maps the old cache (Windows), play
+        # from the source this time and recompile on a later load
+        return from_rows(*read_source(path))
+    return open_compiled(compiled)[1]
+
+
+# size the window to a map, up to VIEW_*_TILES (larger maps scroll)
+def apply_screen_size(game_map):
+    s.MAP_WIDTH_TILES, s.MAP_HEIGHT_TILES = game_map.width, game_map.height
+    s.SCREEN_WIDTH = min(game_map.width, s.VIEW_WIDTH_TILES) * s.TILE_SIZE
+    s.SCREEN_HEIGHT = min(game_map.height, s.VIEW_HEIGHT_TILES) * s.TILE_SIZE
+    s.SCREEN_SIZE = (s.SCREEN_WIDTH, s.SCREEN_HEIGHT)
@@ -0,0 +1,484 @@
+# net.py
+# two-player matches over the network (asyncio, TCP)
+# the server runs every match headless and is the only one simulating;
+# clients send their inputs and draw what the server tells them. Every two
+# clients that connect are paired into a new match, so one server process
+# hosts as many matches as its CPU allows.
+#
+# after a HELLO (map, settings, seed) the server only sends what changed in
+# each tick: tanks and bullets that appeared, went away or stopped moving the
+# way they were, destroyed walls and score/status changes. Both sides keep
+# moving tanks and bullets along their last direction and speed (glide), so a
+# tank driving straight or a bullet in flight costs nothing until it turns,
+# stops or dies. A tick where nothing changed is still sent as a bare header:
+# it is what moves the client's gliding sprites along, so they don't freeze
+# between deltas and jump when the next one arrives.
+#
+#   python net.py server [--port 5555]
+#   python net.py client [--host 127.0.0.1] [--port 5555] [--bot SEED] [--headless]
+
+import argparse
+import asyncio
+import json
+import os
+import struct
+import sys
+import time
+
+import pygame
+import settings as s
+from replay import DIRECTIONS, SHOOT, sim_settings
+
+PORT = 5555
+RESTART_DELAY = 3.0 # seconds between the end of a match and the next one
+
+# message framing: type, payload length
+MESSAGE = struct.Struct('<BI')
+# largest payload each side accepts before dropping the connection: clients
+# only send one INPUT byte, the server's HELLO carries the whole map
+MAX_CLIENT_MESSAGE = 64
+MAX_SERVER_MESSAGE = 16 << 20
+HELLO, TICK, RESET, INPUT = 1, 2, 3, 10
+
+# INPUT payload: direction index | SHOOT (one player's nibble of a replay.py frame)
+INPUT_BYTE = struct.Struct('<B')
+RESET_SEED = struct.Struct('<I')
+
+# TICK payload: tick number, mask of the sections that follow (in bit order)
+TICK_HEADER = struct.Struct('<IB')
+STATUS, TANKS, TANKS_GONE, BULLETS, BULLETS_GONE, WALLS_GONE = (1 << i for i in range(6))
+COUNT = struct.Struct('<H')
+ID = struct.Struct('<I')
+WALL = struct.Struct('<H')
+# flags (playing, game over, victory), winner, P1 score, P2 score, enemies left
+STATUS_RECORD = struct.Struct('<BBHHH')
+# id, x, y, direction, pixels moved last tick, kind, hp
+TANK_RECORD = struct.Struct('<IhhBhBi')
+# id, x, y, direction, owner
+BULLET_RECORD = struct.Struct('<IhhBB')
+
+DIR_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+OWNERS = ['P1', 'P2', 'Enemy']
+WINNERS = [None, 'P1', 'P2']
+KINDS = ['P1', 'P2', 'white', 'green'] # players keep ids 1 and 2
+MOVES = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+
+
+async def read_message(reader, limit):
+    kind, size = MESSAGE.unpack(await reader.readexactly(MESSAGE.size))
+    if size > limit:
+        raise ConnectionError(f"message of {size} bytes is over the {limit} byte limit")
+    return kind, await reader.readexactly(size)
+
+
+def encode(kind, payload=b''):
+    return MESSAGE.pack(kind, len(payload)) + payload
+
+
+def encode_input(direction, shoot):
+    return encode(INPUT, INPUT_BYTE.pack(DIR_INDEX[direction] | (SHOOT if shoot else 0)))
+
+
+# move a rect the way Tank.update/Bullet.update would on open ground
+def glide(rect, direction, speed, steps=1):
+    dx, dy = MOVES[direction]
+    for _ in range(steps):
+        rect.x += dx * speed
+        rect.y += dy * speed
+
+
+# ---- server ----
+
+# what the clients know, kept in step with what they predict and diffed
+# against the game every tick
+class DeltaEncoder:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.status = None
+        self.tanks = {} # sprite -> [id, predicted rect, direction, speed, kind, hp, last position]
+        self.bullets = {} # sprite -> [id, predicted rect, direction, owner]
+        self.dead_walls = set()
+        self.next_id = 3
+
+    def _new_id(self):
+        self.next_id += 1
+        return self.next_id - 1
+
+    # TICK payload for this tick, only the header if nothing changed
+    def encode(self, game, tick):
+        mask = 0
+        body = []
+
+        enemies_left = game.total_enemies_to_spawn - game.enemies_spawned + game.enemy_count()
+        status = ((game.playing | game.game_over << 1 | game.game_victory << 2), WINNERS.index(game.winner),
+                  game.player1.score, game.player2.score, enemies_left)
+        if status != self.status:
+            self.status = status
+            mask |= STATUS
+            body.append(STATUS_RECORD.pack(*status))
+
+        tanks, records = {}, []
+        for tank in [player for player in (game.player1, game.player2) if player.alive()] + game.enemies.sprites():
+            known = self.tanks.pop(tank, None)
+            kind = KINDS.index(tank.owner if tank.owner != 'Enemy' else tank.type)
+            x, y = tank.rect.topleft
+            if known is None:
+                net_id = tank.player_num if kind < 2 else self._new_id()
+                known = [net_id, tank.rect.copy(), None, 0, kind, None, (x, y)]
+            else:
+                glide(known[1], known[2], known[3])
+            # glide at the distance it really moved this tick: a tank pushing
+            # against a wall has a speed but stays put
+            dx, dy = MOVES[tank.direction]
+            moved = (x - known[6][0]) * dx + (y - known[6][1]) * dy
+            known[6] = (x, y)
+            if known[1].topleft != (x, y) or known[2:6] != [tank.direction, moved, kind, tank.hp]:
+                known[1].topleft = (x, y)
+                known[2:6] = [tank.direction, moved, kind, tank.hp]
+                records.append(TANK_RECORD.pack(known[0], x, y, DIR_INDEX[tank.direction], moved, kind, tank.hp))
+            tanks[tank] = known
+        if records:
+            mask |= TANKS
+            body += [COUNT.pack(len(records))] + records
+        if self.tanks:
+            mask |= TANKS_GONE
+            body += [COUNT.pack(len(self.tanks))] + [ID.pack(known[0]) for known in self.tanks.values()]
+        self.tanks = tanks
+
+        # a pooled Bullet object may have died and been fired again within
+        # one tick: it's the same bullet only if it's where the last one would be
+        bullets, records, gone = {}, [], []
+        for bullet in game.bullets:
+            known = self.bullets.pop(bullet, None)
+            if known is not None:
+                glide(known[1], known[2], bullet.speed)
+                if known[1].topleft == bullet.rect.topleft and known[2:] == [bullet.direction, bullet.owner]:
+                    bullets[bullet] = known
+                    continue
+                gone.append(known[0])
+            known = bullets[bullet] = [self._new_id(), bullet.rect.copy(), bullet.direction, bullet.owner]
+            records.append(BULLET_RECORD.pack(known[0], bullet.rect.x, bullet.rect.y,
+                                              DIR_INDEX[bullet.direction], OWNERS.index(bullet.owner)))
+        gone += [known[0] for known in self.bullets.values()]
+        if records:
+            mask |= BULLETS
+            body += [COUNT.pack(len(records))] + records
+        if gone:
+            mask |= BULLETS_GONE
+            body += [COUNT.pack(len(gone))] + [ID.pack(net_id) for net_id in gone]
+        self.bullets = bullets
+
+        dead = [i for i, wall in enumerate(game.wall_list) if i not in self.dead_walls and not wall.alive()]
+        if dead:
+            self.dead_walls.update(dead)
+            mask |= WALLS_GONE
+            body += [COUNT.pack(len(dead))] + [WALL.pack(i) for i in dead]
+
+        return TICK_HEADER.pack(tick, mask) + b''.join(body)
+
+
+class Match:
+    def __init__(self, number, clients):
+        from main import Game
+        from simclock import SimClock
+        self.number = number
+        self.clients = clients # [(reader, writer)] for P1, P2
+        self.inputs = [[None, False], [None, False]] # held direction, shoot pressed since last tick
+        self.game = Game(headless=True, clock=SimClock(), controller=self.control, engine='sprites')
+        self.delta = DeltaEncoder()
+        self.bytes_sent = 0
+        self.ticks = 0
+        self.cpu_time = 0.0
+
+    # Game.controller: latest input from that player's client
+    def control(self, game, player):
+        held = self.inputs[player.player_num - 1]
+        shoot, held[1] = held[1], False
+        return held[0], shoot
+
+    def broadcast(self, data):
+        self.bytes_sent += len(data) * len(self.clients)
+        for _, writer in self.clients:
+            writer.write(data)
+
+    async def listen(self, slot, reader):
+        while True:
+            kind, payload = await read_message(reader, MAX_CLIENT_MESSAGE)
+            if kind == INPUT:
+                # the byte comes from the client, check it like the size
+                if len(payload) != INPUT_BYTE.size or payload[0] & 7 >= len(DIRECTIONS):
+                    raise ConnectionError(f"player {slot + 1} sent a bad INPUT {payload!r}")
+                value = payload[0]
+                self.inputs[slot][0] = DIRECTIONS[value & 7]
+                self.inputs[slot][1] |= bool(value & SHOOT)
+
+    async def run(self):
+        import mapfile
+        game = self.game
+        game.new_game()
+        level = game.level
+        hello = {'seed': game.seed, 'settings': sim_settings(),
+                 'map': mapfile.format_text(level.rows(), level.player1_spawn, level.player2_spawn)}
+        for slot, (_, writer) in enumerate(self.clients):
+            writer.write(encode(HELLO, json.dumps(dict(hello, slot=slot + 1)).encode('utf-8')))
+        self.listeners = [asyncio.create_task(self.listen(slot, reader))
+                          for slot, (reader, _) in enumerate(self.clients)]
+        try:
+            while True:
+                await self.play()
+                print(f"match {self.number}: {game.frame_count} ticks, winner {game.winner or '-'}, "
+                      f"{self.bytes_sent / max(self.ticks, 1) / 2:.1f} B/tick per client, "
+                      f"{self.cpu_time * 1000 / max(self.ticks, 1):.2f} ms CPU/tick")
+                await asyncio.sleep(RESTART_DELAY)
+                game.new_game()
+                self.delta.clear()
+                self.broadcast(encode(RESET, RESET_SEED.pack(game.seed)))
+        finally:
+            for task in self.listeners:
+                task.cancel()
+            for _, writer in self.clients:
+                writer.close()
+
+    # one match at FPS ticks per second, catching up if the loop fell behind
+    async def play(self):
+        game = self.game
+        game.playing = True
+        step = 1 / s.FPS
+        next_tick = time.perf_counter()
+        while game.playing:
+            if any(task.done() for task in self.listeners):
+                raise ConnectionError("client disconnected")
+            started = time.perf_counter()
+            game.clock.tick()
+            game.events()
+            game.update()
+            game.frame_count += 1
+            self.ticks += 1
+            self.broadcast(encode(TICK, self.delta.encode(game, game.frame_count)))
+            self.cpu_time += time.perf_counter() - started
+            for _, writer in self.clients:
+                await writer.drain()
+            next_tick += step
+            await asyncio.sleep(max(0, next_tick - time.perf_counter()))
+
+
+# False once the peer hung up (the connection may have been lost while
+# nobody was reading it)
+def is_open(reader, writer):
+    return not (writer.is_closing() or reader.at_eof() or reader.exception() is not None)
+
+
+async def serve(host='0.0.0.0', port=PORT):
+    waiting = []
+    matches = 0
+
+    # forget clients that left before an opponent arrived
+    def drop_closed():
+        for reader, writer in waiting[:]:
+            if not is_open(reader, writer):
+                waiting.remove((reader, writer))
+                writer.close()
+
+    async def connected(reader, writer):
+        nonlocal matches
+        drop_closed()
+        waiting.append((reader, writer))
+        if len(waiting) < 2:
+            return
+        matches += 1
+        match = Match(matches, waiting[:])
+        waiting.clear()
+        try:
+            await match.run()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            print(f"match {match.number}: a player left")
+
+    server = await asyncio.start_server(connected, host, port)
+    print(f"serving on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+# ---- client ----
+
+# applies TICK messages to a local Game that is only drawn, never updated
+class Mirror:
+    def __init__(self, game):
+        self.game = game
+        self.clear()
+
+    # drop what new_game() spawned locally, the server sends its own
+    def clear(self):
+        game = self.game
+        for sprite in game.enemies.sprites() + game.bullets.sprites():
+            sprite.kill()
+        self.tanks = {1: game.player1, 2: game.player2}
+        self.bullets = {}
+        self.tick = 0
+
+    def apply(self, payload):
+        from sprites import EnemyTank
+        from assets import get_tank_images
+        game = self.game
+        tick, mask = TICK_HEADER.unpack_from(payload)
+        offset = TICK_HEADER.size
+
+        # everything kept moving on the ticks since the last message
+        steps = tick - self.tick
+        self.tick = tick
+        for sprite in list(self.tanks.values()) + list(self.bullets.values()):
+            glide(sprite.rect, sprite.direction, sprite.speed, steps)
+
+        def records(record):
+            nonlocal offset
+            count, = COUNT.unpack_from(payload, offset)
+            offset += COUNT.size
+            for _ in range(count):
+                yield record.unpack_from(payload, offset)
+                offset += record.size
+
+        status = None
+        if mask & STATUS:
+            status = STATUS_RECORD.unpack_from(payload, offset)
+            offset += STATUS_RECORD.size
+            flags, winner, game.player1.score, game.player2.score, _ = status
+            game.playing, game.game_over, game.game_victory = bool(flags & 1), bool(flags & 2), bool(flags & 4)
+            game.winner = WINNERS[winner]
+        if mask & TANKS:
+            for net_id, x, y, direction, speed, kind, hp in records(TANK_RECORD):
+                tank = self.tanks.get(net_id)
+                direction = DIRECTIONS[direction]
+                if tank is None:
+                    tank = self.tanks[net_id] = EnemyTank.restored(game, x, y, direction, KINDS[kind], hp)
+                    game.all_sprites.add(tank)
+                    game.enemies.add(tank)
+                elif kind >= 2 and tank.type != KINDS[kind]:
+                    tank.type = KINDS[kind] # damaged green enemy
+                    tank.images = get_tank_images(tank.type)
+                tank.rect.topleft = (x, y)
+                tank.direction = direction
+                tank.image = tank.images[direction]
+                tank.speed, tank.hp = speed, hp
+        if mask & TANKS_GONE:
+            for net_id, in records(ID):
+                self.tanks.pop(net_id).kill()
+        if mask & BULLETS:
+            for net_id, x, y, direction, owner in records(BULLET_RECORD):
+                bullet = game.bullet_pool.acquire(0, 0, DIRECTIONS[direction], OWNERS[owner])
+                bullet.rect.topleft = (x, y)
+                game.bullets.add(bullet)
+                self.bullets[net_id] = bullet
+        if mask & BULLETS_GONE:
+            for net_id, in records(ID):
+                self.bullets.pop(net_id).kill()
+        if mask & WALLS_GONE:
+            for index, in records(WALL):
+                game.destroy_wall(game.wall_list[index])
+        if status is not None:
+            # the HUD shows total - spawned + on screen
+            game.enemies_spawned = 0
+            game.total_enemies_to_spawn = status[4] - game.enemy_count()
+
+
+# max_ticks stops after that many server ticks of the current match (testing)
+async def play_client(host='127.0.0.1', port=PORT, bot=None, headless=False, max_ticks=None):
+    import mapfile
+    from main import Game
+    from simclock import SimClock
+    from sprites import draw_text
+
+    reader, writer = await asyncio.open_connection(host, port)
+    kind, payload = await read_message(reader, MAX_SERVER_MESSAGE)
+    hello = json.loads(payload)
+    for name, value in hello['settings'].items():
+        setattr(s, name, value)
+    level = mapfile.from_rows(*mapfile.parse_text(hello['map']))
+    # the client never simulates, its clock only has to exist
+    game = Game(headless=headless, clock=SimClock(), game_map=level, engine='sprites')
+    game.new_game(seed=hello['seed'])
+    mirror = Mirror(game)
+    me = game.player1 if hello['slot'] == 1 else game.player2
+    if not headless:
+        pygame.display.set_caption(f"{s.TITLE} - player {hello['slot']}")
+    print(f"connected as player {hello['slot']}")
+
+    messages = []
+    async def receive():
+        while True:
+            messages.append(await read_message(reader, MAX_SERVER_MESSAGE))
+    receiver = asyncio.create_task(receive())
+
+    direction = last_sent = None
+    step = 1 / s.FPS
+    try:
+        while game.running and not receiver.done():
+            started = time.perf_counter()
+            shoot = False
+            if bot is not None:
+                direction, shoot = bot(game, me)
+            if not headless:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        game.running = False
+                    if event.type == pygame.KEYDOWN and event.key in (s.P1_SHOOT, s.P2_SHOOT):
+                        shoot = True
+                    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                        shoot = True
+                if bot is None:
+                    # either key set steers this client's tank
+                    direction = game.player1.get_input() or game.player2.get_input()
+            if shoot or direction != last_sent:
+                writer.write(encode_input(direction, shoot))
+                last_sent = direction
+
+            for kind, payload in messages:
+                if kind == TICK:
+                    mirror.apply(payload)
+                elif kind == RESET:
+                    game.new_game(seed=RESET_SEED.unpack(payload)[0])
+                    mirror.clear()
+            messages.clear()
+
+            if not headless:
+                game.draw()
+                if not game.playing and (game.game_over or game.game_victory):
+                    text = "VICTORY!" if game.game_victory else f"GAME OVER - winner: {game.winner or '-'}"
+                    draw_text(game.screen, text, 40, s.SCREEN_WIDTH / 2, s.SCREEN_HEIGHT / 2, s.YELLOW, game.font_name)
+                    pygame.display.flip()
+                    game.prev_dirty = None
+            if max_ticks is not None and mirror.tick >= max_ticks:
+                break
+            await writer.drain()
+            await asyncio.sleep(max(0, step - (time.perf_counter() - started)))
+    finally:
+        receiver.cancel()
+        writer.close()
+    return game, mirror
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='networked two-player ' + s.TITLE)
+    parser.add_argument('mode', choices=['server', 'client'])
+    parser.add_argument('--host', help='address to listen on / connect to')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--bot', type=int, metavar='SEED', help='client: play with a random bot instead of the keyboard')
+    parser.add_argument('--headless', action='store_true', help='client: no window (use with --bot)')
+    args = parser.parse_args(argv)
+
+    if args.mode == 'server':
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        asyncio.run(serve(args.host or '0.0.0.0', args.port))
+        return 0
+
+    bot = None
+    if args.bot is not None:
+        from batch import RandomBot
+        bot = RandomBot(args.bot)
+    asyncio.run(play_client(args.host or '127.0.0.1', args.port, bot, args.headless))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# pathfinding.py
+# shared flow fields for the enemy AI
+# one breadth-first distance map per goal (each player, the boss area) is
+# computed over the tile grid and every enemy just looks up the neighbour
+# tile that is closer to its goal, so the cost doesn't grow with the number
+# of enemies. A destroyed wall only lowers distances around it, so that is
+# patched locally instead of recomputing the whole field.
+# Player fields only reach FLOW_FIELD_RADIUS steps from the player, so
+# refreshing one costs the same on any map size; enemies further away head
+# for the boss (whose field covers the whole map and is built once) instead.
+
+import settings as s
+
+UNREACHABLE = -1
+# (direction, dx, dy)
+NEIGHBOURS = (('UP', 0, -1), ('DOWN', 0, 1), ('LEFT', -1, 0), ('RIGHT', 1, 0))
+
+
+class FlowField:
+    def __init__(self, graph, limit=None):
+        self.graph = graph # the PathPlanner: width, height, passable, links
+        self.limit = limit # largest distance stored, None for no limit
+        self.targets = []
+        self.dist = [UNREACHABLE] * (graph.width * graph.height) # flat, ty * width + tx
+
+    # full breadth-first search from all target tiles
+    def compute(self, targets):
+        self.targets = list(targets)
+        width, passable = self.graph.width, self.graph.passable
+        self.dist = dist = [UNREACHABLE] * len(passable)
+        ring = []
+        for tx, ty in self.targets:
+            i = ty * width + tx
+            if passable[i] and dist[i] == UNREACHABLE:
+                dist[i] = 0
+                ring.append(i)
+        # first visit is the shortest: no need for _spread's distance test
+        links, limit = self.graph.links, self.limit
+        d = 0
+        while ring and (limit is None or d < limit):
+            d += 1
+            next_ring = []
+            for i in ring:
+                for j in links[i]:
+                    if dist[j] == UNREACHABLE:
+                        dist[j] = d
+                        next_ring.append(j)
+            ring = next_ring
+
+    # relax distances outward one ring at a time, starting from tiles at
+    # distance d
+    def _spread(self, ring, d):
+        dist, links, limit = self.dist, self.graph.links, self.limit
+        while ring and (limit is None or d < limit):
+            d += 1
+            next_ring = []
+            for i in ring:
+                for j in links[i]:
+                    if dist[j] == UNREACHABLE or dist[j] > d:
+                        dist[j] = d
+                        next_ring.append(j)
+            ring = next_ring
+
+    # a wall at (tx, ty) was removed: only tiles that get closer are touched
+    def open_tile(self, tx, ty):
+        best = UNREACHABLE
+        for _, ox, oy in NEIGHBOURS:
+            d = self.distance(tx + ox, ty + oy)
+            if d != UNREACHABLE and (best == UNREACHABLE or d + 1 < best):
+                best = d + 1
+        if best == UNREACHABLE or (self.limit is not None and best > self.limit):
+            return
+        i = ty * self.graph.width + tx
+        self.dist[i] = best
+        self._spread([i], best)
+
+    def distance(self, tx, ty):
+        graph = self.graph
+        if 0 <= tx < graph.width and 0 <= ty < graph.height:
+            return self.dist[ty * graph.width + tx]
+        return UNREACHABLE
+
+    # direction of the neighbour one step closer to the goal, None at the goal
+    # or when the goal can't be reached from here
+    def direction(self, tx, ty):
+        here = self.distance(tx, ty)
+        if here <= 0:
+            return None
+        for name, ox, oy in NEIGHBOURS:
+            d = self.distance(tx + ox, ty + oy)
+            if d != UNREACHABLE and d < here:
+                return name
+        return None
+
+
+class PathPlanner:
+    def __init__(self, wall_grid, boss_walls):
+        width, height = self.width, self.height = wall_grid.width, wall_grid.height
+        # tiles are numbered ty * width + tx: the neighbours of each inside
+        # the map, which tiles are open, and the open neighbours of each
+        # (what the searches walk)
+        self.neighbours = [tuple(ny * width + nx for _, ox, oy in NEIGHBOURS
+                                 for nx, ny in [(tx + ox, ty + oy)] if 0 <= nx < width and 0 <= ny < height)
+                           for ty in range(height) for tx in range(width)]
+        self.passable = []
+        self.links = []
+        self.set_passable([cell is None for row in wall_grid.cells for cell in row])
+        self.fields = {}
+        self.player_tiles = {}
+        self.last_refresh = {}
+
+        # goal tiles around the boss: free tiles next to any boss tile
+        boss_targets = set()
+        for wall in boss_walls:
+            bx, by = wall.rect.x // s.TILE_SIZE, wall.rect.y // s.TILE_SIZE
+            for _, ox, oy in NEIGHBOURS:
+                nx, ny = bx + ox, by + oy
+                if 0 <= ny < height and 0 <= nx < width and self.passable[ny * width + nx]:
+                    boss_targets.add((nx, ny))
+        if boss_targets:
+            self.fields['boss'] = FlowField(self)
+            self.fields['boss'].compute(sorted(boss_targets))
+
+    def set_passable(self, passable):
+        self.passable[:] = passable
+        self.links[:] = [tuple(j for j in near if passable[j]) for near in self.neighbours]
+
+    # start-of-match state: open tiles and the boss field (player fields are
+    # rebuilt on the first update anyway)
+    def snapshot(self):
+        boss = self.fields.get('boss')
+        return self.passable[:], boss and (boss.targets, boss.dist[:])
+
+    def restore(self, snapshot):
+        passable, boss = snapshot
+        self.set_passable(passable)
+        self.fields = {}
+        self.player_tiles = {}
+        self.last_refresh = {}
+        if boss:
+            field = self.fields['boss'] = FlowField(self)
+            field.targets = list(boss[0])
+            field.dist = boss[1][:]
+
+    def wall_removed(self, wall):
+        tx, ty = wall.rect.x // s.TILE_SIZE, wall.rect.y // s.TILE_SIZE
+        i = ty * self.width + tx
+        self.passable[i] = True
+        self.links[i] = tuple(j for j in self.neighbours[i] if self.passable[j])
+        for j in self.links[i]:
+            self.links[j] += (i,)
+        for field in self.fields.values():
+            field.open_tile(tx, ty)
+
+    # recompute a player's field when they changed tile, at most every
+    # FLOW_FIELD_REFRESH ms and one field per tick (the other player's waits
+    # for the next tick)
+    def update(self, now, players):
+        for player in players:
+            tile = tile_of(player.rect)
+            key = player.owner
+            if self.player_tiles.get(key) == tile:
+                continue
+            if key in self.fields and now - self.last_refresh.get(key, 0) < s.FLOW_FIELD_REFRESH:
+                continue
+            field = self.fields.get(key)
+            if field is None:
+                field = self.fields[key] = FlowField(self, s.FLOW_FIELD_RADIUS)
+            field.compute([tile])
+            self.player_tiles[key] = tile
+            self.last_refresh[key] = now
+            return
+
+    # name of the reachable goal closest to tile, or None
+    def nearest_goal(self, tile):
+        best, best_dist = None, None
+        for name, field in self.fields.items():
+            d = field.distance(*tile)
+            if d > 0 and (best_dist is None or d < best_dist):
+                best, best_dist = name, d
+        return best
+
+    def direction(self, goal, tile):
+        field = self.fields.get(goal)
+        if field is None:
+            return None
+        return field.direction(*tile)
+
+
+# tile under the centre of a rect
+def tile_of(rect):
+    return rect.centerx // s.TILE_SIZE, rect.centery // s.TILE_SIZE
@@ -0,0 +1,107 @@
+# pipeline.py
+# pipelined mode (settings.PIPELINED_RENDERING, python main.py --pipelined)
+# the simulation runs on its own thread and ends every tick by taking a
+# RenderFrame: the images and screen positions of everything to draw, the
+# HUD values and the camera, as plain values that the next tick doesn't touch.
+# The main thread, which owns the window, reads the keyboard and draws the
+# newest frame while the simulation works on the following tick, so blits and
+# display updates (which release the GIL) overlap with game logic.
+# If the simulation is ahead, frames the main thread never got to are skipped;
+# the walls destroyed in them are handed on to the next frame.
+# The main thread times its draws and the simulation adds that time to its
+# next profiler frame as 'draw' (the profiler itself is only used from the
+# simulation thread).
+
+import threading
+import time
+
+
+class RenderFrame:
+    __slots__ = ('frame', 'view', 'scrolled', 'sprites', 'bars', 'hud', 'walls_removed')
+
+    def __init__(self, frame, view, scrolled, sprites, bars, hud, walls_removed):
+        self.frame = frame # frame_count of the tick it shows
+        self.view = view # camera rect in map pixels
+        self.scrolled = scrolled # the camera moved since the previous frame
+        self.sprites = sprites # [(image, screen rect)] in drawing order
+        self.bars = bars # [(HealthBar, x, y, hp)]
+        self.hud = hud # (P1 score, P2 score, enemies left)
+        self.walls_removed = walls_removed # walls whose terrain tile must be cleared
+
+
+class Pipeline:
+    def __init__(self, game):
+        self.game = game
+        self.ready = threading.Condition()
+        self.latest = None # newest frame not drawn yet
+        self.directions = [None, None] # keys held (main thread), per player
+        self.shots = [False, False] # shoot pressed since the last tick
+        self.draw_time = 0.0 # seconds spent drawing since the simulation last took it
+        self.error = None
+
+    # Game.events() in pipelined mode: the inputs the main thread collected
+    def take_inputs(self, game, players):
+        if game.controller is not None:
+            return [game.controller(game, player) for player in players]
+        with self.ready:
+            inputs = list(zip(self.directions, self.shots))
+            self.shots = [False, False]
+        return inputs
+
+    def publish(self, frame):
+        with self.ready:
+            if self.latest is not None: # never drawn
+                frame.walls_removed[:0] = self.latest.walls_removed
+                frame.scrolled = frame.scrolled or self.latest.scrolled
+            self.latest = frame
+            self.ready.notify()
+
+    # simulation thread
+    def simulate(self, max_frames):
+        game = self.game
+        try:
+            while game.playing:
+                game.step(max_frames)
+                frame = game.render_frame()
+                if game.profiler:
+                    game.profiler.lap('render_frame')
+                    with self.ready:
+                        drawn, self.draw_time = self.draw_time, 0.0
+                    game.profiler.add('draw', drawn)
+                    game.profiler.end_frame()
+                self.publish(frame)
+        except BaseException as e:
+            self.error = e
+            game.playing = False
+        with self.ready:
+            self.ready.notify()
+
+    # main thread: input and drawing until the simulation stops
+    def run(self, max_frames=None):
+        game = self.game
+        game.pipeline = self
+        thread = threading.Thread(target=self.simulate, args=(max_frames,), name='simulation', daemon=True)
+        thread.start()
+        try:
+            while True:
+                shots = game.poll_events()
+                directions = [player.get_input() for player in (game.player1, game.player2)]
+                with self.ready:
+                    self.directions = directions
+                    self.shots = [a or b for a, b in zip(self.shots, shots)]
+                    if self.latest is None and thread.is_alive():
+                        self.ready.wait(0.05)
+                    frame, self.latest = self.latest, None
+                if frame is not None:
+                    started = time.perf_counter()
+                    game.draw(frame)
+                    with self.ready:
+                        self.draw_time += time.perf_counter() - started
+                elif not thread.is_alive():
+                    break
+        finally:
+            game.playing = False
+            thread.join()
+            game.pipeline = None
+        if self.error is not None:
+            raise self.error
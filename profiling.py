@@ -0,0 +1,65 @@
+# profiling.py
+# per-frame section timing for Game (attach with game.profiler = FrameProfiler())
+# the game calls lap(name) at the end of each timed section; a lap measures
+# the time since the previous lap in the same frame
+
+import time
+
+
+class FrameProfiler:
+    def __init__(self):
+        self.frames = [] # one {section: seconds} dict per frame
+        self.current = {}
+        self._last = 0.0
+
+    def begin_frame(self):
+        self.current = {}
+        self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.current[name] = self.current.get(name, 0.0) + now - self._last
+        self._last = now
+
+    # a section timed somewhere else (another thread), added to this frame
+    def add(self, name, seconds):
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def end_frame(self):
+        self.frames.append(self.current)
+
+    def sections(self):
+        names = []
+        for frame in self.frames:
+            for name in frame:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    # {section: {mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}, plus 'update' (sum of
+    # the update.* sections) and 'frame' (everything)
+    def summary(self):
+        series = {name: [f.get(name, 0.0) for f in self.frames] for name in self.sections()}
+        update = [name for name in series if name.startswith('update.')]
+        series['update'] = [sum(f.get(name, 0.0) for name in update) for f in self.frames]
+        series['frame'] = [sum(f.values()) for f in self.frames]
+        return {name: stats(values) for name, values in series.items()}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def stats(values):
+    ordered = sorted(values)
+    ms = 1000.0
+    return {
+        'mean_ms': round(sum(ordered) / len(ordered) * ms, 4) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * ms, 4),
+        'p95_ms': round(percentile(ordered, 95) * ms, 4),
+        'p99_ms': round(percentile(ordered, 99) * ms, 4),
+        'max_ms': round(ordered[-1] * ms, 4) if ordered else 0.0,
+    }
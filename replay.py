@@ -0,0 +1,216 @@
+# replay.py
+# input recording and bit-exact headless replay
+# a recording holds what a match can't derive by itself: the match seed, the
+# simulation settings, the map, and for every frame both players' inputs and
+# the clock time. Everything else follows from the game's seeded RNG streams.
+# A CRC of Game.snapshot() every CHECK_INTERVAL frames (and at the end) lets
+# a replay prove it reproduced the match, and shows where it stopped doing so.
+#
+#   python main.py --record match.replay
+#   python replay.py match.replay [more.replay ...] [--out perf.json] [--compare old.json]
+#
+# file: zlib-compressed JSON header line, then FRAME records
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+import settings as s
+
+FORMAT = 2
+# inputs (P1 in the low nibble, P2 in the high one), ms since the last frame
+# (32-bit: a long stall in an interactive session must replay as long)
+FRAME = struct.Struct('<BI')
+DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT', None]
+SHOOT = 8 # bit set in a player's nibble when they pressed shoot
+CHECK_INTERVAL = 60
+# settings that change the simulation (everything else is display/input)
+SIM_SETTINGS = ('TILE_SIZE', 'FPS', 'ENGINE')
+SIM_PREFIXES = ('PLAYER_', 'ENEMY_', 'BULLET_', 'FLOW_FIELD_')
+
+
+def sim_settings():
+    return {name: getattr(s, name) for name in dir(s)
+            if name in SIM_SETTINGS or name.startswith(SIM_PREFIXES)}
+
+
+# the clock is left out: the recording and the replay run on different clocks,
+# the time the game saw is covered by the timers in the snapshot
+def state_crc(game):
+    import snapshot
+    return zlib.crc32(snapshot.save(game, clock=False))
+
+
+def pack_inputs(inputs):
+    byte = 0
+    for shift, (direction, shoot) in zip((0, 4), inputs):
+        byte |= (DIRECTIONS.index(direction) | (SHOOT if shoot else 0)) << shift
+    return byte
+
+
+def unpack_inputs(byte):
+    return [(DIRECTIONS[(byte >> shift) & 7], bool((byte >> shift) & SHOOT)) for shift in (0, 4)]
+
+
+# attached as Game.recorder (Game.enable_recording), fed once per frame
+class Recorder:
+    def __init__(self, path=None):
+        self.path = path
+        self.matches = 0
+        self.header = None
+        self.frames = bytearray()
+
+    def new_match(self, game):
+        import mapfile
+        level = game.level
+        self.header = {
+            'format': FORMAT,
+            'seed': game.seed,
+            'engine': game.engine_mode,
+            'settings': sim_settings(),
+            'map': mapfile.format_text(level.rows(), level.player1_spawn, level.player2_spawn),
+            'start_ticks': game.clock.get_ticks(),
+            'checksums': {},
+        }
+        self.frames = bytearray()
+        self.last_ticks = self.header['start_ticks']
+
+    # inputs = [(direction, shoot)] for P1, P2 as applied this frame
+    def record(self, game, inputs):
+        if game.frame_count % CHECK_INTERVAL == 0:
+            self.header['checksums'][str(game.frame_count)] = state_crc(game)
+        now = game.clock.get_ticks()
+        self.frames += FRAME.pack(pack_inputs(inputs), now - self.last_ticks)
+        self.last_ticks = now
+
+    def end_match(self, game):
+        self.header['frames'] = len(self.frames) // FRAME.size
+        self.header['final'] = state_crc(game)
+        self.matches += 1
+        if self.path:
+            path = self.path
+            if self.matches > 1:
+                root, ext = os.path.splitext(path)
+                path = f"{root}-{self.matches}{ext}"
+            with open(path, 'wb') as f:
+                f.write(self.to_bytes())
+
+    def to_bytes(self):
+        return zlib.compress(json.dumps(self.header).encode('utf-8') + b'\n' + bytes(self.frames), 9)
+
+
+class Replay:
+    def __init__(self, data):
+        header, _, frames = zlib.decompress(data).partition(b'\n')
+        self.header = json.loads(header)
+        if self.header.get('format') != FORMAT:
+            raise ValueError("unsupported replay format")
+        self.frames = [FRAME.unpack_from(frames, i) for i in range(0, len(frames), FRAME.size)]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    # Game.controller: the recorded inputs of the current frame
+    def __call__(self, game, player):
+        if game.frame_count >= len(self.frames):
+            return None, False
+        return unpack_inputs(self.frames[game.frame_count][0])[player.player_num - 1]
+
+    # re-simulate headless at full speed, re-recording as it goes; returns
+    # (game, recorder), the recording matches the original if nothing diverged
+    def play(self, profiler=None):
+        import mapfile
+        from main import Game
+        for name, value in self.header['settings'].items():
+            setattr(s, name, value)
+        level = mapfile.from_rows(*mapfile.parse_text(self.header['map']))
+        game = Game(headless=True, clock=ReplayClock(self), controller=self,
+                    engine=self.header['engine'], game_map=level)
+        game.enable_recording()
+        game.new_game(seed=self.header['seed'])
+        game.profiler = profiler
+        game.run(max_frames=len(self.frames))
+        return game, game.recorder
+
+    # first checked frame whose state differs from the recording, None if
+    # the replay is bit-exact
+    def diverged_at(self, recorder):
+        checksums = recorder.header['checksums']
+        for frame, crc in sorted(self.header['checksums'].items(), key=lambda item: int(item[0])):
+            if checksums.get(frame) != crc:
+                return int(frame)
+        if recorder.header['frames'] != self.header['frames'] or recorder.header['final'] != self.header['final']:
+            return self.header['frames']
+        return None
+
+
+# Game.clock for a replay: steps through the recorded frame times
+class ReplayClock:
+    def __init__(self, replay):
+        self.frames = replay.frames
+        self.ticks = replay.header['start_ticks']
+        self.frame = 0
+
+    def get_ticks(self):
+        return self.ticks
+
+    def tick(self, framerate=0):
+        step = self.frames[self.frame][1] if self.frame < len(self.frames) else 0
+        self.frame += 1
+        self.ticks += step
+        return step
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='re-simulate recorded matches headless and check they match')
+    parser.add_argument('replays', nargs='+', metavar='FILE')
+    parser.add_argument('--out', help='write per-replay frame timings as JSON (benchmark.py format)')
+    parser.add_argument('--compare', metavar='FILE', help='show timings relative to an earlier --out file')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    from profiling import FrameProfiler
+    from benchmark import print_report
+
+    results = {'scenarios': {}}
+    failed = 0
+    for path in args.replays:
+        replay = Replay.load(path)
+        profiler = FrameProfiler()
+        started = time.perf_counter()
+        game, recorder = replay.play(profiler)
+        elapsed = time.perf_counter() - started
+        frame = replay.diverged_at(recorder)
+        status = 'ok' if frame is None else f'DIVERGED at frame {frame}'
+        failed += frame is not None
+        print(f"{path}: {game.frame_count} frames in {elapsed:.2f}s "
+              f"({game.frame_count / elapsed:.0f} fps), {status}")
+        results['scenarios'][os.path.basename(path)] = {
+            'frames': game.frame_count,
+            'wall_time_s': round(elapsed, 4),
+            'fps': round(game.frame_count / elapsed, 1),
+            'diverged_at': frame,
+            'phases': profiler.summary(),
+        }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    if args.out or args.compare:
+        print_report(results, baseline)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+# rng.py
+# seeded random streams owned by the game (Game.spawn_rng / Game.ai_rng)
+# each stream is an independent generator derived from the match seed and
+# the stream name, so a match replays exactly from its seed and inputs, and
+# one system drawing more numbers doesn't shift what another one gets.
+# RandomStream keeps the random.Random API (choice, randint, random, ...) on
+# a splitmix64 generator whose whole state is one 64-bit int, which keeps
+# snapshots small.
+
+import random
+import zlib
+
+MASK = (1 << 64) - 1
+
+
+class RandomStream(random.Random):
+    def __init__(self, seed=0, name=''):
+        super().__init__((seed, name))
+
+    def seed(self, a=None, version=2):
+        seed, name = a if isinstance(a, tuple) else (a or 0, '')
+        self.state = (int(seed) * 0x9E3779B97F4A7C15 + zlib.crc32(name.encode())) & MASK
+
+    def _next(self):
+        self.state = z = (self.state + 0x9E3779B97F4A7C15) & MASK
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK
+        return z ^ (z >> 31)
+
+    def random(self):
+        return (self._next() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k):
+        bits, n = 0, 0
+        while n < k:
+            bits = (bits << 64) | self._next()
+            n += 64
+        return bits >> (n - k)
+
+    def getstate(self):
+        return self.state
+
+    def setstate(self, state):
+        self.state = state
@@ -11,7 +11,22 @@ MAP_HEIGHT_TILES = 26
 SCREEN_WIDTH = MAP_WIDTH_TILES * TILE_SIZE
 SCREEN_HEIGHT = MAP_HEIGHT_TILES * TILE_SIZE
 SCREEN_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
+# largest window in tiles; bigger maps scroll with a camera following the players
+VIEW_WIDTH_TILES = 26
+VIEW_HEIGHT_TILES = 26
+# terrain is baked in square chunks of this many tiles, at most
+# TERRAIN_CHUNK_CACHE chunks are kept (the least recently drawn go first)
+TERRAIN_CHUNK_TILES = 8
+TERRAIN_CHUNK_CACHE = 64
 FPS = 60
+# only push changed screen areas with display.update() instead of flip()
+# (helps on software-rendered / low-end machines)
+DIRTY_RECT_RENDERING = False
+# run the simulation on a second thread while the main thread draws the
+# previous tick (pipeline.py; python main.py --pipelined)
+PIPELINED_RENDERING = False
+# key that shows/hides the telemetry overlay (python main.py --telemetry)
+TELEMETRY_OVERLAY_KEY = pygame.K_F3
 
 # color define for UI
 BLACK = (0, 0, 0)
@@ -55,6 +70,19 @@ SND_BANG_ENEMY = 'boom.wav'
 SND_BANG_PLAYER = 'boom.wav'
 SND_HIT_IRON = 'boom.wav'
 
+# sound effects share AUDIO_CHANNELS mixer channels; when all are busy a
+# sound takes over the channel of the oldest lower-priority one (or is
+# dropped), and each sound starts at most N times per SOUND_RATE_WINDOW ms
+AUDIO_CHANNELS = 8
+SOUND_RATE_WINDOW = 250
+# name: (file, priority, N)
+SOUNDS = {
+    'fire': (SND_FIRE, 1, 3),
+    'hit_iron': (SND_HIT_IRON, 0, 2),
+    'bang_enemy': (SND_BANG_ENEMY, 2, 2),
+    'bang_player': (SND_BANG_PLAYER, 3, 2),
+}
+
 # player and enemy tank information
 PLAYER_HP = 3
 PLAYER_SPEED = 3
@@ -68,9 +96,28 @@ ENEMY_HP_WHITE = 1
 ENEMY_HP_GREEN = 2
 ENEMY_SPEED = 2
 ENEMY_SHOOT_COOLDOWN = 1500
+ENEMY_CHASE_CHANCE = 0.6  # chance an enemy follows a flow field (player / boss) instead of wandering
+ENEMY_REQUIRE_CLEAR_SHOT = True  # only fire along a row/column with a player and no wall in between
+FLOW_FIELD_REFRESH = 500  # ms between recomputing a moving player's flow field
+FLOW_FIELD_RADIUS = 48  # steps a player's flow field reaches (covers the whole stock map)
+# enemies further than this many tiles from every player only run their AI
+# every ENEMY_FAR_AI_INTERVAL frames (they keep moving); 0 = always think
+ENEMY_AI_ACTIVE_RADIUS = 0
+ENEMY_FAR_AI_INTERVAL = 8
 BULLET_SPEED = 7
 BULLET_COOLDOWN = 500
 
+# 'sprites': one Sprite per enemy/bullet (default)
+# 'numpy': enemies and bullets stored in NumPy arrays and updated in batches,
+#          for stress scenarios with thousands of objects (needs numpy)
+ENGINE = 'sprites'
+
+# rewards per player and step for bots trained with vecenv.py
+REWARD_SCORE = 1.0  # per enemy killed
+REWARD_DAMAGE = -0.2  # per hp lost
+REWARD_WIN = 10.0  # match won (boss shot or player killed), the loser gets -REWARD_WIN
+REWARD_VICTORY = 5.0  # every enemy destroyed, to both players
+
 # for map.py
 MAP_TILE_EMPTY = 0
 MAP_TILE_RED_WALL = 1
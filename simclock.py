@@ -0,0 +1,39 @@
+# simclock.py
+# clocks the game logic reads its time from (Game.clock)
+# WallClock is the normal real-time clock, SimClock advances a fixed step on
+# every tick() so headless matches run as fast as the CPU allows
+# both only move on tick(): everything in one frame sees the same time, so a
+# match can be replayed from the per-frame times (see replay.py)
+
+import pygame
+import settings as s
+
+
+class WallClock:
+    def __init__(self):
+        self._clock = pygame.time.Clock()
+        self.now = pygame.time.get_ticks()
+
+    def get_ticks(self):
+        return self.now
+
+    # sleeps to keep the frame rate, returns ms since the last tick
+    def tick(self, framerate=0):
+        elapsed = self._clock.tick(framerate)
+        self.now = pygame.time.get_ticks()
+        return elapsed
+
+
+class SimClock:
+    # step_ms defaults to one frame at the FPS set when the clock is made
+    def __init__(self, step_ms=None):
+        self.step_ms = step_ms if step_ms is not None else 1000 / s.FPS
+        self.ticks = 0.0
+
+    def get_ticks(self):
+        return int(self.ticks)
+
+    # framerate is ignored, time moves one fixed step and never sleeps
+    def tick(self, framerate=0):
+        self.ticks += self.step_ms
+        return self.step_ms
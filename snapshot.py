@@ -0,0 +1,234 @@
+# snapshot.py
+# compact binary snapshot of a running match (Game.snapshot / Game.restore)
+# for rollback, instant replays and bug reproduction
+#
+# the world built by Game.build_world() is the reference: walls are stored
+# as an alive bitmap over game.wall_list (plus health for damaged ones), and
+# tanks, bullets, timers, match flags, the clock and the RNG streams as packed
+# records. Flow fields and sight spans aren't stored, restore() derives them
+# from the walls and the players' tiles. A snapshot only fits the world (map)
+# it was taken from.
+
+import struct
+import settings as s
+from sprites import EnemyTank
+from pathfinding import FlowField
+
+MAGIC = b'TWS4'
+# magic, frame, clock ms, enemies spawned, enemies total, flags, winner,
+# walls, damaged walls, enemies, bullets, path fields, engine bytes
+HEADER = struct.Struct('<4sIdIIBBIIIIBI')
+# x, y, direction, hp, score, last shot, speed, alive, damage taken
+PLAYER = struct.Struct('<iiBiIidBI')
+# owner, tile x, tile y, last refresh
+PATH_FIELD = struct.Struct('<Bhhi')
+DAMAGED_WALL = struct.Struct('<Ih')
+# x, y, direction, type, hp, move timer, move cooldown, shoot timer, goal, speed, ai phase
+ENEMY = struct.Struct('<iiBBiiiiBdI')
+# x, y, direction, owner
+BULLET = struct.Struct('<iiBB')
+# states of the game's random streams (spawn, ai)
+RNG = struct.Struct('<QQ')
+
+DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT']
+DIR_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+OWNERS = ['P1', 'P2', 'Enemy']
+OWNER_INDEX = {o: i for i, o in enumerate(OWNERS)}
+WINNERS = [None, 'P1', 'P2']
+GOALS = [None, 'P1', 'P2', 'boss']
+ENEMY_TYPES = ['white', 'green']
+
+PLAYING, GAME_OVER, VICTORY, TIMED_OUT, BOSS_INTACT = 1, 2, 4, 8, 16
+
+
+# clock=False leaves the clock out (zero), for comparing runs made with
+# different clocks (replay.py checksums)
+def save(game, clock=True):
+    walls = game.wall_list
+    start_health = game.world_snapshot[0]
+    alive = bytearray((len(walls) + 7) // 8)
+    damaged = []
+    for i, wall in enumerate(walls):
+        if wall.alive():
+            alive[i >> 3] |= 1 << (i & 7)
+            if wall.health != start_health[i]:
+                damaged.append(DAMAGED_WALL.pack(i, wall.health))
+
+    flags = ((PLAYING if game.playing else 0) | (GAME_OVER if game.game_over else 0) |
+             (VICTORY if game.game_victory else 0) | (TIMED_OUT if game.timed_out else 0) |
+             (BOSS_INTACT if game.boss_group else 0))
+    pathing = game.pathing
+    path_fields = [key for key in pathing.player_tiles]
+    engine = game.engine.snapshot() if game.engine is not None else b''
+    enemies = game.enemies.sprites()
+    bullets = game.bullets.sprites()
+
+    ticks = getattr(game.clock, 'ticks', 0) if clock else 0
+    parts = [HEADER.pack(MAGIC, game.frame_count, ticks, game.enemies_spawned,
+                         game.total_enemies_to_spawn, flags, WINNERS.index(game.winner), len(walls),
+                         len(damaged), len(enemies), len(bullets), len(path_fields), len(engine)),
+             bytes(alive)]
+    parts += damaged
+    for player in (game.player1, game.player2):
+        parts.append(PLAYER.pack(player.rect.x, player.rect.y, DIR_INDEX[player.direction], player.hp,
+                                 player.score, player.last_shot_time, player.speed, player.alive(),
+                                 player.damage_taken))
+    for key in path_fields:
+        tx, ty = pathing.player_tiles[key]
+        parts.append(PATH_FIELD.pack(OWNER_INDEX[key], tx, ty, pathing.last_refresh[key]))
+    for enemy in enemies:
+        parts.append(ENEMY.pack(enemy.rect.x, enemy.rect.y, DIR_INDEX[enemy.direction],
+                                ENEMY_TYPES.index(enemy.type), enemy.hp, enemy.move_timer, enemy.move_cooldown,
+                                enemy.shoot_timer, GOALS.index(enemy.goal), enemy.speed, enemy.ai_phase))
+    for bullet in bullets:
+        parts.append(BULLET.pack(bullet.rect.x, bullet.rect.y, DIR_INDEX[bullet.direction],
+                                 OWNER_INDEX[bullet.owner]))
+    parts.append(RNG.pack(game.spawn_rng.getstate(), game.ai_rng.getstate()))
+    parts.append(engine)
+    return b''.join(parts)
+
+
+def load(game, data):
+    (magic, frame, ticks, spawned, total, flags, winner, n_walls, n_damaged, n_enemies,
+     n_bullets, n_fields, engine_size) = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a Tank War snapshot")
+    if n_walls != len(game.wall_list):
+        raise ValueError("snapshot was taken on a different map")
+    offset = HEADER.size
+
+    alive = data[offset:offset + (n_walls + 7) // 8]
+    offset += len(alive)
+    health = list(game.world_snapshot[0])
+    for _ in range(n_damaged):
+        i, value = DAMAGED_WALL.unpack_from(data, offset)
+        health[i] = value
+        offset += DAMAGED_WALL.size
+    walls_changed = _restore_walls(game, alive, health, flags & BOSS_INTACT)
+
+    players = []
+    for player in (game.player1, game.player2):
+        x, y, direction, hp, score, last_shot, speed, is_alive, damage = PLAYER.unpack_from(data, offset)
+        offset += PLAYER.size
+        player.rect.topleft = (x, y)
+        player.direction = DIRECTIONS[direction]
+        player.image = player.images[player.direction]
+        player.hp, player.score, player.last_shot_time, player.speed = hp, score, last_shot, speed
+        player.damage_taken = damage
+        if is_alive:
+            players.append(player)
+        else:
+            player.kill()
+    game.players.empty()
+    for player in players:
+        game.all_sprites.add(player)
+        game.players.add(player)
+
+    fields = []
+    for _ in range(n_fields):
+        owner, tx, ty, refresh = PATH_FIELD.unpack_from(data, offset)
+        offset += PATH_FIELD.size
+        fields.append((OWNERS[owner], (tx, ty), refresh))
+    _restore_pathing(game, fields, walls_changed)
+
+    for enemy in game.enemies.sprites():
+        enemy.kill()
+    for _ in range(n_enemies):
+        (x, y, direction, kind, hp, move_timer, move_cooldown, shoot_timer, goal, speed,
+         ai_phase) = ENEMY.unpack_from(data, offset)
+        offset += ENEMY.size
+        enemy = EnemyTank.restored(game, x, y, DIRECTIONS[direction], ENEMY_TYPES[kind], hp)
+        enemy.move_timer, enemy.move_cooldown, enemy.shoot_timer = move_timer, move_cooldown, shoot_timer
+        enemy.goal, enemy.speed, enemy.ai_phase = GOALS[goal], speed, ai_phase
+        game.all_sprites.add(enemy)
+        game.enemies.add(enemy)
+
+    for bullet in game.bullets.sprites():
+        bullet.kill()
+    for _ in range(n_bullets):
+        x, y, direction, owner = BULLET.unpack_from(data, offset)
+        offset += BULLET.size
+        bullet = game.bullet_pool.acquire(0, 0, DIRECTIONS[direction], OWNERS[owner])
+        bullet.rect.topleft = (x, y)
+        game.bullets.add(bullet)
+
+    spawn_state, ai_state = RNG.unpack_from(data, offset)
+    offset += RNG.size
+    game.spawn_rng.setstate(spawn_state)
+    game.ai_rng.setstate(ai_state)
+    if game.engine is not None:
+        game.engine.restore(data[offset:offset + engine_size])
+
+    game.frame_count = frame
+    if hasattr(game.clock, 'ticks'):
+        game.clock.ticks = ticks
+    game.enemies_spawned, game.total_enemies_to_spawn = spawned, total
+    game.playing = bool(flags & PLAYING)
+    game.game_over = bool(flags & GAME_OVER)
+    game.game_victory = bool(flags & VICTORY)
+    game.timed_out = bool(flags & TIMED_OUT)
+    game.winner = WINNERS[winner]
+    game.prev_dirty = None  # everything may have moved, repaint the whole screen
+    game.terrain_dirty = []
+    # the terrain may still show walls destroyed before the load
+    game.walls_removed = [wall for wall in game.walls_removed if not wall.alive()]
+
+
+# bring walls, grid and terrain in line with the alive bitmap
+# returns True if any wall came back or disappeared
+def _restore_walls(game, alive, health, boss_intact):
+    changed = False
+    for i, wall in enumerate(game.wall_list):
+        wall.health = health[i]
+        was_alive = wall.alive()
+        if alive[i >> 3] & (1 << (i & 7)):
+            if not was_alive:
+                game.all_sprites.add(wall)
+                game.walls.add(wall)
+                game.wall_grid.add(wall)
+                if game.terrain is not None:
+                    game.terrain.restore_wall(wall)
+                changed = True
+        elif was_alive:
+            wall.kill()
+            game.wall_grid.remove(wall)
+            if game.terrain is not None:
+                game.terrain.remove_wall(wall)
+            changed = True
+    game.boss_group.empty()
+    if boss_intact:
+        game.boss_group.add(wall for wall in game.wall_list
+                            if wall.wall_type == s.MAP_TILE_BOSS and wall.alive())
+    if changed:
+        # sight spans: start-of-match spans with every dead wall opened again
+        game.sight.restore(game.world_snapshot[2])
+        for wall in game.wall_list:
+            if not wall.alive():
+                game.sight.wall_removed(wall)
+    return changed
+
+
+# flow fields are a pure function of the open tiles and their targets, so
+# they're recomputed only for what changed
+def _restore_pathing(game, fields, walls_changed):
+    pathing = game.pathing
+    old_fields = pathing.fields
+    if walls_changed:
+        pathing.set_passable([cell is None for row in game.wall_grid.cells for cell in row])
+    pathing.fields = {}
+    boss = old_fields.get('boss')
+    if boss is not None:
+        if walls_changed:
+            boss.compute(boss.targets)
+        pathing.fields['boss'] = boss
+    pathing.player_tiles = {}
+    pathing.last_refresh = {}
+    for key, tile, refresh in fields:
+        field = old_fields.get(key)
+        if field is None:
+            field = FlowField(pathing, s.FLOW_FIELD_RADIUS)
+        if walls_changed or field.targets != [tile]:
+            field.compute([tile])
+        pathing.fields[key] = field
+        pathing.player_tiles[key] = tile
+        pathing.last_refresh[key] = refresh
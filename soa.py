@@ -0,0 +1,574 @@
+# soa.py
+# optional struct-of-arrays engine for enemy tanks and bullets (ENGINE = 'numpy')
+# instead of one Sprite per object, positions, directions, hp and timers live
+# in NumPy arrays and movement, wall checks, culling and AI cooldowns run as
+# batch operations; the players stay normal HeroTank sprites
+# enemies follow the same shared flow fields (game.pathing) as EnemyTank, only
+# the ones lined up with a tile look up their next step
+# one engine can also run many games at once (ArrayEngine.batch, used by
+# vecenv.py): every enemy and bullet row carries the index of its game
+# (eenv/benv) and each game gets a BatchSlot as its game.engine
+# needs numpy, which the default sprite engine does not
+
+import struct
+import numpy as np
+import settings as s
+from assets import get_tank_images, get_bullet_image
+from los import BLOCKED
+
+DIRECTIONS = ['UP', 'DOWN', 'LEFT', 'RIGHT']
+DIR_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+DIR_X = np.array([0, 0, -1, 1], dtype=np.int32)
+DIR_Y = np.array([-1, 1, 0, 0], dtype=np.int32)
+
+OWNERS = ['P1', 'P2', 'Enemy']
+OWNER_INDEX = {o: i for i, o in enumerate(OWNERS)}
+ENEMY = OWNER_INDEX['Enemy']
+
+ENEMY_TYPES = ['white', 'green']
+WHITE, GREEN = 0, 1
+
+# flow fields an enemy can follow (egoal, -1 = wander)
+GOALS = ['P1', 'P2', 'boss']
+
+# snapshot layout: bullet/enemy/pending counts, PCG64 state and increment,
+# has_uint32, uinteger, then the arrays below in order
+SNAPSHOT_HEADER = struct.Struct('<III16s16sII')
+BULLET_ARRAYS = ('bx', 'by', 'bdir', 'bowner')
+ENEMY_ARRAYS = ('ex', 'ey', 'edir', 'ehp', 'etype', 'emove_timer', 'emove_cooldown', 'eshoot_timer', 'egoal')
+
+
+class ArrayEngine:
+    # rng: the AI generator, a new one from the match seed when not given
+    def __init__(self, game, rng=None):
+        grid = game.wall_grid
+        self._allocate(1, (grid.height, grid.width))
+        self.games[0] = game
+        self.rngs[0] = rng if rng is not None else np.random.default_rng(game.ai_rng.getrandbits(32))
+        # solid[ty, tx] mirrors the wall grid
+        self.solid[0] = [[cell is not None for cell in row] for row in grid.cells]
+        # the game's sight spans, converted here rather than on the first shot
+        rows, cols = game.sight.span_arrays()
+        self.row_spans, self.col_spans = rows[None], cols[None]
+
+    # one engine stepping the games of engines (maps of one size) together;
+    # each game's engine becomes a BatchSlot into it
+    @classmethod
+    def batch(cls, engines):
+        batch = cls.__new__(cls)
+        batch._allocate(len(engines), engines[0].solid.shape[1:])
+        for g, engine in enumerate(engines):
+            batch.attach(g, engine)
+        return batch
+
+    # empty arrays for n games of shape (height, width) tiles
+    def _allocate(self, n, shape):
+        self.tank_size = s.TILE_SIZE
+        self.bullet_size = s.TILE_SIZE // 4
+        self.games = [None] * n
+        self.rngs = [None] * n # AI generators, each follows its match seed
+        self.pending = [[] for _ in range(n)] # bullets fired outside update(), added at the start of the next one
+        self.enemy_counts = [0] * n
+        # per game: walls, and row/col sight spans (views the game's SightLines patches)
+        self.solid = np.zeros((n,) + tuple(shape), bool)
+        self.row_spans = np.full((n,) + tuple(shape), BLOCKED, np.int32)
+        self.col_spans = np.full((n,) + tuple(shape), BLOCKED, np.int32)
+
+        # bullets
+        self.bx = np.empty(0, np.int32)
+        self.by = np.empty(0, np.int32)
+        self.bdir = np.empty(0, np.int8)
+        self.bowner = np.empty(0, np.int8)
+        self.benv = np.empty(0, np.int32)
+
+        # enemy tanks
+        self.ex = np.empty(0, np.int32)
+        self.ey = np.empty(0, np.int32)
+        self.edir = np.empty(0, np.int8)
+        self.ehp = np.empty(0, np.int16)
+        self.etype = np.empty(0, np.int8)
+        self.emove_timer = np.empty(0, np.int64)
+        self.emove_cooldown = np.empty(0, np.int64)
+        self.eshoot_timer = np.empty(0, np.int64)
+        self.egoal = np.empty(0, np.int8)
+        self.eenv = np.empty(0, np.int32)
+
+        self.enemy_images = [get_tank_images(t) for t in ENEMY_TYPES]
+        self.bullet_image = get_bullet_image()
+
+    # put the single-game engine's game, objects and state in slot g
+    # (replacing what was there) and hand the game a BatchSlot
+    def attach(self, g, engine):
+        for names, env, count in ((ENEMY_ARRAYS, 'eenv', len(engine.ex)), (BULLET_ARRAYS, 'benv', len(engine.bx))):
+            keep = getattr(self, env) != g
+            for name in names:
+                setattr(self, name, np.concatenate((getattr(self, name)[keep], getattr(engine, name))))
+            setattr(self, env, np.concatenate((getattr(self, env)[keep], np.full(count, g, np.int32))))
+        game = self.games[g] = engine.games[0]
+        self.rngs[g] = engine.rngs[0]
+        self.pending[g] = list(engine.pending[0])
+        self.enemy_counts[g] = len(engine.ex)
+        self.solid[g] = engine.solid[0]
+        self.row_spans[g] = engine.row_spans[0]
+        self.col_spans[g] = engine.col_spans[0]
+        game.sight.arrays = (self.row_spans[g], self.col_spans[g])
+        game.engine = BatchSlot(self, g)
+
+    # a single-game engine holding a copy of slot g
+    def detach(self, g):
+        engine = ArrayEngine(self.games[g], self.rngs[g])
+        for names, env in ((ENEMY_ARRAYS, self.eenv), (BULLET_ARRAYS, self.benv)):
+            mine = env == g
+            for name in names:
+                setattr(engine, name, getattr(self, name)[mine])
+        engine.eenv = np.zeros(len(engine.ex), np.int32)
+        engine.benv = np.zeros(len(engine.bx), np.int32)
+        engine.pending[0] = list(self.pending[g])
+        engine.enemy_counts[0] = len(engine.ex)
+        return engine
+
+    @property
+    def enemy_count(self):
+        return len(self.ex)
+
+    @property
+    def bullet_count(self):
+        return len(self.bx) + sum(len(pending) for pending in self.pending)
+
+    # the game's SightLines already patched the spans
+    def wall_removed(self, wall, g=0):
+        self.solid[g, wall.rect.y // s.TILE_SIZE, wall.rect.x // s.TILE_SIZE] = False
+
+    # same rules as EnemyTank.__init__
+    def spawn_enemy(self, tx, ty, g=0):
+        game = self.games[g]
+        now = game.clock.get_ticks()
+        rng = game.spawn_rng
+        enemy_type = rng.choice(ENEMY_TYPES)
+        hp = s.ENEMY_HP_WHITE if enemy_type == 'white' else s.ENEMY_HP_GREEN
+        move_cooldown = rng.randint(1000, 3000)
+        direction = rng.choice(DIRECTIONS)
+        self.ex = np.append(self.ex, tx * s.TILE_SIZE).astype(np.int32)
+        self.ey = np.append(self.ey, ty * s.TILE_SIZE).astype(np.int32)
+        self.edir = np.append(self.edir, DIR_INDEX[direction]).astype(np.int8)
+        self.ehp = np.append(self.ehp, hp).astype(np.int16)
+        self.etype = np.append(self.etype, ENEMY_TYPES.index(enemy_type)).astype(np.int8)
+        self.emove_timer = np.append(self.emove_timer, now)
+        self.emove_cooldown = np.append(self.emove_cooldown, move_cooldown)
+        self.eshoot_timer = np.append(self.eshoot_timer, now)
+        self.egoal = np.append(self.egoal, -1).astype(np.int8)
+        self.eenv = np.append(self.eenv, g).astype(np.int32)
+        self.enemy_counts[g] += 1
+
+    # packed arrays, pending bullets and RNG state (see snapshot.py); single game
+    def snapshot(self):
+        rng = self.rngs[0].bit_generator.state
+        pending = np.array(self.pending[0], np.int32).reshape(-1, 4)
+        parts = [SNAPSHOT_HEADER.pack(len(self.bx), len(self.ex), len(pending),
+                                      rng['state']['state'].to_bytes(16, 'little'),
+                                      rng['state']['inc'].to_bytes(16, 'little'),
+                                      rng['has_uint32'], rng['uinteger'])]
+        parts += [getattr(self, name).tobytes() for name in BULLET_ARRAYS + ENEMY_ARRAYS]
+        parts.append(pending.tobytes())
+        return b''.join(parts)
+
+    def restore(self, data):
+        n_bullets, n_enemies, n_pending, state, inc, has_uint32, uinteger = SNAPSHOT_HEADER.unpack_from(data)
+        offset = SNAPSHOT_HEADER.size
+        for name in BULLET_ARRAYS + ENEMY_ARRAYS:
+            dtype = getattr(self, name).dtype
+            count = n_bullets if name in BULLET_ARRAYS else n_enemies
+            setattr(self, name, np.frombuffer(data, dtype, count, offset).copy())
+            offset += count * dtype.itemsize
+        self.benv = np.zeros(n_bullets, np.int32)
+        self.eenv = np.zeros(n_enemies, np.int32)
+        self.enemy_counts[0] = n_enemies
+        pending = np.frombuffer(data, np.int32, n_pending * 4, offset).reshape(-1, 4)
+        self.pending[0] = [tuple(row) for row in pending.tolist()]
+        self.rngs[0].bit_generator.state = {'bit_generator': 'PCG64',
+                                            'state': {'state': int.from_bytes(state, 'little'),
+                                                      'inc': int.from_bytes(inc, 'little')},
+                                            'has_uint32': has_uint32, 'uinteger': uinteger}
+        self.solid[0] = [[cell is not None for cell in row] for row in self.games[0].wall_grid.cells]
+
+    # x, y is the tank centre, like Bullet.__init__
+    def add_bullet(self, x, y, direction, owner, g=0):
+        self.pending[g].append((x, y, DIR_INDEX[direction], OWNER_INDEX[owner]))
+
+    def _fire(self, cx, cy, dirs, owners, envs):
+        size = self.bullet_size
+        half = size // 2
+        # place the bullet in front of the centre point, same as Bullet.__init__
+        left = np.where(dirs == 2, cx - size, np.where(dirs == 3, cx, cx - half))
+        top = np.where(dirs == 0, cy - size, np.where(dirs == 1, cy, cy - half))
+        self.bx = np.concatenate((self.bx, left.astype(np.int32)))
+        self.by = np.concatenate((self.by, top.astype(np.int32)))
+        self.bdir = np.concatenate((self.bdir, dirs.astype(np.int8)))
+        self.bowner = np.concatenate((self.bowner, owners.astype(np.int8)))
+        self.benv = np.concatenate((self.benv, envs.astype(np.int32)))
+
+    def _flush_pending(self):
+        shots = [shot + (g,) for g, pending in enumerate(self.pending) for shot in pending]
+        if shots:
+            self.pending = [[] for _ in self.pending]
+            x, y, d, o, g = (np.array(col) for col in zip(*shots))
+            self._fire(x, y, d, o, g)
+
+    # True where (rows, cols) of game envs is a wall tile or outside the map
+    def _blocked(self, envs, rows, cols):
+        _, h, w = self.solid.shape
+        inside = (rows >= 0) & (rows < h) & (cols >= 0) & (cols < w)
+        result = ~inside
+        result[inside] = self.solid[envs[inside], rows[inside], cols[inside]]
+        return result
+
+    # (alive, x, y, w, h) arrays over the games for P1, then P2
+    def _players(self):
+        state = np.array([(player.alive(),) + tuple(player.rect) for game in self.games
+                          for player in (game.player1, game.player2)], np.int64).reshape(-1, 2, 5)
+        return [(state[:, k, 0] != 0,) + tuple(state[:, k, 1:].T) for k in (0, 1)]
+
+    # ---- per tick ----
+
+    def update(self):
+        self._flush_pending()
+        if not len(self.ex) and not len(self.bx):
+            return
+        players = self._players()
+        if len(self.ex):
+            now = np.array([game.clock.get_ticks() for game in self.games], np.int64)
+            self._enemy_ai(now[self.eenv], players)
+            self._move_enemies()
+        if len(self.bx):
+            self._move_bullets(players)
+
+    # EnemyTank.ai_move / ai_shoot for every enemy at once; now is per enemy
+    def _enemy_ai(self, now, players):
+        awake = self._awake(players)
+        turn = np.flatnonzero((now - self.emove_timer > self.emove_cooldown) & awake)
+        if len(turn):
+            self.emove_timer[turn] = now[turn]
+            # each game draws from its own generator, in the order it would alone
+            envs = self.eenv[turn]
+            for g in np.unique(envs).tolist():
+                idx = turn[envs == g]
+                self.emove_cooldown[idx] = self.rngs[g].integers(1000, 3001, len(idx))
+                self._choose_goals(idx, g)
+        self._follow_goals(awake)
+
+        fire = np.flatnonzero((now - self.eshoot_timer > s.ENEMY_SHOOT_COOLDOWN) & awake)
+        if len(fire) and s.ENEMY_REQUIRE_CLEAR_SHOT:
+            fire = self._aim(fire, players)
+        if len(fire):
+            self.eshoot_timer[fire] = now[fire]
+            half = self.tank_size // 2
+            self._fire(self.ex[fire] + half, self.ey[fire] + half, self.edir[fire],
+                       np.full(len(fire), ENEMY, np.int8), self.eenv[fire])
+
+    # EnemyTank.ai_move for the enemies in idx (all in game g): chase the nearest
+    # goal with ENEMY_CHASE_CHANCE, otherwise (or when none is reachable) pick a direction
+    def _choose_goals(self, idx, g):
+        rng = self.rngs[g]
+        goals = np.full(len(idx), -1, np.int8)
+        chase = np.flatnonzero(rng.random(len(idx)) < s.ENEMY_CHASE_CHANCE)
+        if len(chase):
+            t, half = s.TILE_SIZE, self.tank_size // 2
+            pathing = self.games[g].pathing
+            chasers = idx[chase]
+            tiles = zip(((self.ex[chasers] + half) // t).tolist(), ((self.ey[chasers] + half) // t).tolist())
+            for k, tile in zip(chase.tolist(), tiles):
+                goal = pathing.nearest_goal(tile)
+                if goal is not None:
+                    goals[k] = GOALS.index(goal)
+        self.egoal[idx] = goals
+        wander = idx[goals < 0]
+        self.edir[wander] = rng.integers(0, 4, len(wander))
+
+    # EnemyTank.follow_goal: enemies within a step of a tile snap onto it and
+    # turn toward the neighbour the flow field says is closer to their goal
+    def _follow_goals(self, awake):
+        t, speed = s.TILE_SIZE, s.ENEMY_SPEED
+        tx, ty = (self.ex + t // 2) // t, (self.ey + t // 2) // t
+        ready = ((self.egoal >= 0) & awake &
+                 (np.abs(self.ex - tx * t) < speed) & (np.abs(self.ey - ty * t) < speed))
+        idx = np.flatnonzero(ready)
+        if not len(idx):
+            return
+        tx, ty = tx[idx], ty[idx]
+        self.ex[idx] = tx * t
+        self.ey[idx] = ty * t
+        games = self.games
+        for e, g, gx, gy, goal in zip(idx.tolist(), self.eenv[idx].tolist(), tx.tolist(), ty.tolist(),
+                                      self.egoal[idx].tolist()):
+            direction = games[g].pathing.direction(GOALS[goal], (gx, gy))
+            if direction is None:
+                self.egoal[e] = -1 # reached it (or it's cut off), wander again
+            else:
+                self.edir[e] = DIR_INDEX[direction]
+
+    # EnemyTank.ai_asleep: enemies far from every player think every few frames
+    def _awake(self, players):
+        radius = s.ENEMY_AI_ACTIVE_RADIUS * s.TILE_SIZE
+        if not radius:
+            return True
+        envs = self.eenv
+        # an enemy's index among its own game's enemies staggers the frames
+        order = np.argsort(envs, kind='stable')
+        rank = np.empty(len(envs), np.int64)
+        rank[order] = np.arange(len(envs)) - np.searchsorted(envs[order], envs[order])
+        frames = np.array([game.frame_count for game in self.games], np.int64)
+        awake = (frames[envs] + rank) % s.ENEMY_FAR_AI_INTERVAL == 0
+        for alive, x, y, _, _ in players:
+            near = np.maximum(np.abs(self.ex - x[envs]), np.abs(self.ey - y[envs])) <= radius
+            awake |= alive[envs] & near
+        return awake
+
+    # EnemyTank.ai_shoot's clear-shot rule for the enemies in idx: turn toward a
+    # player in the same row/column span and keep only those that can fire
+    def _aim(self, idx, players):
+        t, half = s.TILE_SIZE, self.tank_size // 2
+        n, h, w = self.row_spans.shape
+        envs = self.eenv[idx]
+        tx = np.clip((self.ex[idx] + half) // t, 0, w - 1)
+        ty = np.clip((self.ey[idx] + half) // t, 0, h - 1)
+        row = self.row_spans[envs, ty, tx]
+        col = self.col_spans[envs, ty, tx]
+        dirs = np.full(len(idx), -1, np.int8)
+        for alive, x, y, pw, ph in players:
+            px = np.clip((x + pw // 2) // t, 0, w - 1)
+            py = np.clip((y + ph // 2) // t, 0, h - 1)
+            games = np.arange(n)
+            player_row = self.row_spans[games, py, px][envs]
+            player_col = self.col_spans[games, py, px][envs]
+            alive, px, py = alive[envs], px[envs], py[envs]
+            in_row = (alive & (dirs < 0) & (ty == py) & (tx != px) & (row != BLOCKED) &
+                      (row == player_row))
+            dirs[in_row] = np.where(px[in_row] > tx[in_row], DIR_INDEX['RIGHT'], DIR_INDEX['LEFT'])
+            in_col = (alive & (dirs < 0) & (tx == px) & (ty != py) & (col != BLOCKED) &
+                      (col == player_col))
+            dirs[in_col] = np.where(py[in_col] > ty[in_col], DIR_INDEX['DOWN'], DIR_INDEX['UP'])
+        aimed = dirs >= 0
+        idx = idx[aimed]
+        self.edir[idx] = dirs[aimed]
+        return idx
+
+    # Tank.update + check_collision: move one axis, push back out of walls
+    def _move_enemies(self):
+        t, size = s.TILE_SIZE, self.tank_size
+        speed = s.ENEMY_SPEED
+        envs = self.eenv
+        dx = DIR_X[self.edir] * speed
+        dy = DIR_Y[self.edir] * speed
+
+        nx = self.ex + dx
+        top_row, bottom_row = self.ey // t, (self.ey + size - 1) // t
+        lead = np.where(dx > 0, (nx + size - 1) // t, nx // t)
+        hit = (dx != 0) & (self._blocked(envs, top_row, lead) | self._blocked(envs, bottom_row, lead))
+        nx = np.where(hit & (dx > 0), lead * t - size, nx)
+        nx = np.where(hit & (dx < 0), (lead + 1) * t, nx)
+        self.ex = nx.astype(np.int32)
+
+        ny = self.ey + dy
+        left_col, right_col = self.ex // t, (self.ex + size - 1) // t
+        lead = np.where(dy > 0, (ny + size - 1) // t, ny // t)
+        hit = (dy != 0) & (self._blocked(envs, lead, left_col) | self._blocked(envs, lead, right_col))
+        ny = np.where(hit & (dy > 0), lead * t - size, ny)
+        ny = np.where(hit & (dy < 0), (lead + 1) * t, ny)
+        self.ey = ny.astype(np.int32)
+
+    def _move_bullets(self, players):
+        games = self.games
+        t, size = s.TILE_SIZE, self.bullet_size
+        speed = s.BULLET_SPEED
+        n = len(self.bx)
+        envs = self.benv
+        alive = np.ones(n, bool)
+        hit_row = np.full(n, -1, np.int32)
+        hit_col = np.full(n, -1, np.int32)
+        dx, dy = DIR_X[self.bdir], DIR_Y[self.bdir]
+
+        # sub-steps of at most one tile so fast bullets can't skip a wall;
+        # only the two corners on the leading edge need checking
+        steps = max(1, -(-speed // t))
+        far = size - 1
+        ax = np.where(dx > 0, far, 0); ay = np.where(dy > 0, far, 0)
+        bx_off = np.where(dx < 0, 0, far); by_off = np.where(dy < 0, 0, far)
+        moving = np.ones(n, bool)
+        for k in range(steps):
+            step = speed * (k + 1) // steps - speed * k // steps
+            self.bx = np.where(moving, self.bx + dx * step, self.bx).astype(np.int32)
+            self.by = np.where(moving, self.by + dy * step, self.by).astype(np.int32)
+            rows_a, cols_a = (self.by + ay) // t, (self.bx + ax) // t
+            rows_b, cols_b = (self.by + by_off) // t, (self.bx + bx_off) // t
+            hit_a = moving & self._blocked(envs, rows_a, cols_a)
+            hit_b = moving & ~hit_a & self._blocked(envs, rows_b, cols_b)
+            hit_row = np.where(hit_a, rows_a, np.where(hit_b, rows_b, hit_row))
+            hit_col = np.where(hit_a, cols_a, np.where(hit_b, cols_b, hit_col))
+            moving &= ~(hit_a | hit_b)
+
+        # off-map culling
+        _, h, w = self.solid.shape
+        on_screen = ((self.bx < w * t) & (self.bx + size > 0) &
+                     (self.by < h * t) & (self.by + size > 0))
+        alive &= on_screen | ~moving
+
+        # (1) bullet vs wall: only the few bullets that hit something loop in
+        # Python; a hit that ends a match (boss shot) ends that game's tick
+        playing = np.ones(len(games), bool)
+        for i in np.flatnonzero(~moving).tolist():
+            g = envs[i]
+            if not playing[g]:
+                continue
+            alive[i] = False
+            game = games[g]
+            wall = game.wall_grid.get(int(hit_col[i]), int(hit_row[i]))
+            if wall is None:
+                continue # map edge
+            if game.bullet_hits_wall(OWNERS[self.bowner[i]], wall):
+                playing[g] = False
+        live = playing[envs]
+
+        # (2) bullet vs player, P1 then P2 in each game
+        for k, (present, x, y, pw, ph) in enumerate(players):
+            hits = (alive & live & present[envs] & (self.bowner != k) &
+                    self._overlap(x[envs], y[envs], pw[envs], ph[envs]))
+            done = set() # games whose player died
+            for i in np.flatnonzero(hits).tolist():
+                g = int(envs[i])
+                player = games[g].player2 if k else games[g].player1
+                if g in done or not player.alive():
+                    done.add(g)
+                    continue
+                player.take_damage(1, OWNERS[self.bowner[i]])
+                alive[i] = False
+
+        # (3) bullet vs enemy
+        shooters = np.flatnonzero(alive & live & (self.bowner != ENEMY))
+        killers = []
+        if len(shooters) and len(self.ex):
+            bx, by = self.bx[shooters, None], self.by[shooters, None]
+            ts = self.tank_size
+            overlap = ((bx < self.ex + ts) & (bx + size > self.ex) &
+                       (by < self.ey + ts) & (by + size > self.ey) & (envs[shooters, None] == self.eenv))
+            for row in np.flatnonzero(overlap.any(axis=1)).tolist():
+                i = shooters[row]
+                targets = overlap[row] & (self.ehp > 0)
+                if not targets.any():
+                    continue # already killed by another bullet this tick
+                e = int(np.argmax(targets))
+                alive[i] = False
+                killer = self.damage_enemy(e, 1, OWNERS[self.bowner[i]])
+                if killer:
+                    killers.append((envs[i], killer))
+        self._keep_bullets(alive)
+        self.remove_dead_enemies()
+        for g, killer in killers:
+            games[g].enemy_killed(killer)
+
+    def _overlap(self, x, y, w, h):
+        size = self.bullet_size
+        return (self.bx < x + w) & (self.bx + size > x) & (self.by < y + h) & (self.by + size > y)
+
+    def _keep_bullets(self, keep):
+        self.bx, self.by = self.bx[keep], self.by[keep]
+        self.bdir, self.bowner, self.benv = self.bdir[keep], self.bowner[keep], self.benv[keep]
+
+    def remove_dead_enemies(self):
+        keep = self.ehp > 0
+        if keep.all():
+            return
+        for name in ENEMY_ARRAYS + ('eenv',):
+            setattr(self, name, getattr(self, name)[keep])
+        self.enemy_counts = np.bincount(self.eenv, minlength=len(self.games)).tolist()
+
+    # EnemyTank.take_damage, returns the killer's owner tag when it dies
+    # (the dead row stays until remove_dead_enemies)
+    def damage_enemy(self, e, amount, owner):
+        self.ehp[e] -= amount
+        if self.ehp[e] <= 0:
+            return owner
+        if self.etype[e] == GREEN and self.ehp[e] == 1:
+            self.etype[e] = WHITE
+        return None
+
+    # enemy tanks overlapping a player (end-of-match contact check); single game
+    def enemies_touching(self, rect):
+        ts = self.tank_size
+        return np.flatnonzero((self.ex < rect.right) & (self.ex + ts > rect.left) &
+                              (self.ey < rect.bottom) & (self.ey + ts > rect.top)).tolist()
+
+    # (image, screen rect) of the enemies and bullets overlapping view (camera
+    # rect in map pixels), for Game.render_frame; single game
+    def blits(self, view):
+        ts, bs = self.tank_size, self.bullet_size
+        ex, ey, bx, by = self.ex, self.ey, self.bx, self.by
+        seen = (ex < view.right) & (ex + ts > view.left) & (ey < view.bottom) & (ey + ts > view.top)
+        ex, ey = ex[seen] - view.x, ey[seen] - view.y
+        blits = [(self.enemy_images[t][DIRECTIONS[d]], (x, y, ts, ts)) for x, y, d, t in
+                 zip(ex.tolist(), ey.tolist(), self.edir[seen].tolist(), self.etype[seen].tolist())]
+        seen = (bx < view.right) & (bx + bs > view.left) & (by < view.bottom) & (by + bs > view.top)
+        bx, by = bx[seen] - view.x, by[seen] - view.y
+        image = self.bullet_image
+        blits += [(image, (x, y)) for x, y in zip(bx.tolist(), by.tolist())]
+        return blits
+
+
+# game.engine of a game in a batch: the calls a game makes every tick go to the
+# batch with its index, the rest run on a single-game copy put back afterwards
+class BatchSlot:
+    def __init__(self, batch, g):
+        self.batch, self.g = batch, g
+        self.tank_size, self.bullet_size = batch.tank_size, batch.bullet_size
+
+    @property
+    def enemy_count(self):
+        return self.batch.enemy_counts[self.g]
+
+    @property
+    def bullet_count(self):
+        batch = self.batch
+        return int(np.count_nonzero(batch.benv == self.g)) + len(batch.pending[self.g])
+
+    def spawn_enemy(self, tx, ty):
+        self.batch.spawn_enemy(tx, ty, self.g)
+
+    def add_bullet(self, x, y, direction, owner):
+        self.batch.add_bullet(x, y, direction, owner, self.g)
+
+    def wall_removed(self, wall):
+        self.batch.wall_removed(wall, self.g)
+
+    # this game's rows of the batch arrays (ex, by, ...), copies
+    def __getattr__(self, name):
+        if name in ENEMY_ARRAYS:
+            return getattr(self.batch, name)[self.batch.eenv == self.g]
+        if name in BULLET_ARRAYS:
+            return getattr(self.batch, name)[self.batch.benv == self.g]
+        raise AttributeError(name)
+
+    def _alone(self, method, *args):
+        engine = self.batch.detach(self.g)
+        result = getattr(engine, method)(*args)
+        self.batch.attach(self.g, engine)
+        return result
+
+    def update(self):
+        self._alone('update')
+
+    def snapshot(self):
+        return self.batch.detach(self.g).snapshot()
+
+    def restore(self, data):
+        self._alone('restore', data)
+
+    def remove_dead_enemies(self):
+        self._alone('remove_dead_enemies')
+
+    def damage_enemy(self, e, amount, owner):
+        return self._alone('damage_enemy', e, amount, owner)
+
+    def enemies_touching(self, rect):
+        return self.batch.detach(self.g).enemies_touching(rect)
+
+    def blits(self, view):
+        return self.batch.detach(self.g).blits(view)
@@ -2,41 +2,17 @@
 # for all changable elements
 
 import pygame
-import os
-import random
 import settings as s
-
-#load resources
-def load_image(filename):
-    path = os.path.join(s.IMAGE_DIR, filename)
-    try:
-        image = pygame.image.load(path).convert_alpha()
-    except (pygame.error, FileNotFoundError) as e: 
-        print(f"Error: Unable to load image '{filename}' at path '{path}'.")
-        print(f"Details: {e}")
-        placeholder = pygame.Surface((s.TILE_SIZE, s.TILE_SIZE))
-        placeholder.fill(s.YELLOW) 
-        return placeholder
-    image = pygame.transform.scale(image, (s.TILE_SIZE, s.TILE_SIZE))
-    return image
-
-def load_sound(filename):
-    path = os.path.join(s.SOUND_DIR, filename)
-    try:
-        sound = pygame.mixer.Sound(path)
-    except (pygame.error, FileNotFoundError) as e:
-        print(f"Error: Unable to load sound '{filename}' at path '{path}'.")
-        print(f"Details: {e}")
-        sound = pygame.mixer.Sound(buffer=b'') 
-    return sound
+from assets import get_image, get_bullet_image, get_tank_images, get_font
+from pathfinding import tile_of
 
 #for UI
 def draw_text(surface, text, size, x, y, color, font_name):
-    font = pygame.font.Font(font_name, size)
+    font = get_font(font_name, size)
     text_surface = font.render(text, True, color) # True is for MSAA
     text_rect = text_surface.get_rect()
     text_rect.midtop = (x, y) # position of text
-    surface.blit(text_surface, text_rect)
+    return surface.blit(text_surface, text_rect)
 
 #draw health bar of players' tanks
 def draw_health_bar(surface, x, y, hp, max_hp):
@@ -52,6 +28,43 @@ def draw_health_bar(surface, x, y, hp, max_hp):
     pygame.draw.rect(surface, s.BLACK, outline_rect) #fill the bar outline
     pygame.draw.rect(surface, fill_color, fill_rect)
     pygame.draw.rect(surface, s.WHITE, outline_rect, 1)
+    return outline_rect
+
+# retained text: the surface is only re-rendered when the text changes
+class TextLabel:
+    def __init__(self, size, x, y, color, font_name):
+        self.font = get_font(font_name, size)
+        self.color = color
+        self.pos = (x, y) # midtop, same as draw_text
+        self.text = None
+        self.surface = None
+        self.rect = None
+
+    def set_text(self, text):
+        if text == self.text:
+            return
+        self.text = text
+        self.surface = self.font.render(text, True, self.color)
+        self.rect = self.surface.get_rect()
+        self.rect.midtop = self.pos
+
+    def draw(self, surface):
+        return surface.blit(self.surface, self.rect)
+
+# retained health bar: one pre-drawn surface per hp value
+class HealthBar:
+    def __init__(self, max_hp):
+        self.max_hp = max_hp
+        self.surfaces = {}
+
+    def draw(self, surface, x, y, hp):
+        hp = max(hp, 0)
+        bar = self.surfaces.get(hp)
+        if bar is None:
+            bar = pygame.Surface((s.TILE_SIZE, 7))
+            draw_health_bar(bar, 0, 0, hp, self.max_hp)
+            self.surfaces[hp] = bar
+        return surface.blit(bar, (x, y))
 
 
 # class wall (3 other walls + leaf wall)
@@ -60,32 +73,40 @@ class Wall(pygame.sprite.Sprite):
         pygame.sprite.Sprite.__init__(self)
         self.wall_type = wall_type
         if self.wall_type == s.MAP_TILE_RED_WALL:
-            self.image = load_image(s.IMG_WALL_RED); self.health = 1
+            self.image = get_image(s.IMG_WALL_RED); self.health = 1
         elif self.wall_type == s.MAP_TILE_IRON_WALL:
-            self.image = load_image(s.IMG_WALL_IRON); self.health = float('inf')
+            self.image = get_image(s.IMG_WALL_IRON); self.health = float('inf')
         elif self.wall_type == s.MAP_TILE_BOSS:
-            self.image = load_image(s.IMG_BOSS); self.health = 1
+            self.image = get_image(s.IMG_BOSS); self.health = 1
         self.rect = self.image.get_rect()
         self.rect.topleft = (x * s.TILE_SIZE, y * s.TILE_SIZE)
 # this is specifically for leaf wall
 class Bush(pygame.sprite.Sprite):
     def __init__(self, x, y):
         pygame.sprite.Sprite.__init__(self)
-        self.image = load_image(s.IMG_BUSH)
+        self.image = get_image(s.IMG_BUSH)
         self.rect = self.image.get_rect()
         self.rect.topleft = (x * s.TILE_SIZE, y * s.TILE_SIZE)
 
 # class of bullet
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, x, y, direction, owner):
-        pygame.sprite.Sprite.__init__(self)
-        self.image = load_image(s.IMG_BULLET)
-        bullet_size = (s.TILE_SIZE // 4, s.TILE_SIZE // 4)
-        self.image = pygame.transform.scale(self.image, bullet_size)
+# a plain slotted object rather than a Sprite (no per-bullet dicts): bullets
+# live in a BulletGroup and are recycled through BulletPool, so all state is
+# set in reset()
+class Bullet:
+    __slots__ = ('image', 'rect', 'owner', 'direction', 'speed', 'hit_wall', 'pool', 'group')
+
+    def __init__(self, x, y, direction, owner, pool=None):
+        self.image = get_bullet_image()
         self.rect = self.image.get_rect()
+        self.pool = pool
+        self.group = None
+        self.reset(x, y, direction, owner)
+
+    def reset(self, x, y, direction, owner):
         self.owner = owner
         self.direction = direction
         self.speed = s.BULLET_SPEED
+        self.hit_wall = None # set by update() when the bullet runs into a wall
         if self.direction == 'UP': # direction of bullet is determined by tank's direction
             self.rect.centerx = x; self.rect.bottom = y
         elif self.direction == 'DOWN':
@@ -95,14 +116,71 @@ class Bullet(pygame.sprite.Sprite):
         elif self.direction == 'RIGHT':
             self.rect.left = x; self.rect.centery = y
 
-    def update(self):
-        if self.direction == 'UP': self.rect.y -= self.speed
-        elif self.direction == 'DOWN': self.rect.y += self.speed
-        elif self.direction == 'LEFT': self.rect.x -= self.speed
-        elif self.direction == 'RIGHT': self.rect.x += self.speed
-        if not pygame.Rect(0, 0, s.SCREEN_WIDTH, s.SCREEN_HEIGHT).colliderect(self.rect):
+    def update(self, wall_grid):
+        dx = dy = 0
+        if self.direction == 'UP': dy = -self.speed
+        elif self.direction == 'DOWN': dy = self.speed
+        elif self.direction == 'LEFT': dx = -self.speed
+        elif self.direction == 'RIGHT': dx = self.speed
+        # check every tile crossed on the way, not just the end position
+        self.hit_wall = wall_grid.sweep(self.rect, dx, dy)
+        self.rect.move_ip(dx, dy)
+        if self.hit_wall is None and not wall_grid.bounds.colliderect(self.rect):
             self.kill()
 
+    def alive(self):
+        return self.group is not None
+
+    # a dead bullet goes back to its pool (only once, kill() may be called twice)
+    def kill(self):
+        if self.group is None:
+            return
+        self.group.remove(self)
+        if self.pool is not None:
+            self.pool.release(self)
+
+# the live bullets in firing order, with the bits of pygame's Group API the
+# game uses (add, iteration, sprites(), update())
+class BulletGroup:
+    def __init__(self):
+        self.bullets = {} # bullet -> None, an ordered set
+
+    def add(self, bullet):
+        bullet.group = self
+        self.bullets[bullet] = None
+
+    def remove(self, bullet):
+        del self.bullets[bullet]
+        bullet.group = None
+
+    def sprites(self):
+        return list(self.bullets)
+
+    def __iter__(self):
+        return iter(list(self.bullets))
+
+    def __len__(self):
+        return len(self.bullets)
+
+    def update(self, wall_grid):
+        for bullet in list(self.bullets):
+            bullet.update(wall_grid)
+
+# free list of dead bullets, so sustained fire doesn't allocate new bullets
+class BulletPool:
+    def __init__(self):
+        self.free = []
+
+    def acquire(self, x, y, direction, owner):
+        if self.free:
+            bullet = self.free.pop()
+            bullet.reset(x, y, direction, owner)
+            return bullet
+        return Bullet(x, y, direction, owner, self)
+
+    def release(self, bullet):
+        self.free.append(bullet)
+
 # base class of tank (herotank and enemytank class belong to this)
 class Tank(pygame.sprite.Sprite):
     def __init__(self, x, y, initial_image_surface, hp):
@@ -114,32 +192,42 @@ class Tank(pygame.sprite.Sprite):
         self.vel = pygame.math.Vector2(0, 0)
         self.hp = hp
 
-    def update(self, walls_group):
-        if self.direction == 'UP':
-            self.vel.x = 0; self.vel.y = -self.speed
-        elif self.direction == 'DOWN':
-            self.vel.x = 0; self.vel.y = self.speed
-        elif self.direction == 'LEFT':
-            self.vel.x = -self.speed; self.vel.y = 0
-        elif self.direction == 'RIGHT':
-            self.vel.x = self.speed; self.vel.y = 0
-        
-        self.rect.x += self.vel.x
-        self.check_collision(walls_group, 'x')
-        self.rect.y += self.vel.y
-        self.check_collision(walls_group, 'y')
+    def update(self, wall_grid):
+        speed, direction = self.speed, self.direction
+        if direction == 'UP': dx, dy = 0, -speed
+        elif direction == 'DOWN': dx, dy = 0, speed
+        elif direction == 'LEFT': dx, dy = -speed, 0
+        else: dx, dy = speed, 0
+        self.vel.update(dx, dy)
+
+        # tanks never start a tick inside a wall, so only the axis the tank
+        # moves along needs checking (and nothing when it stands still)
+        if dx:
+            self.rect.x += dx
+            self.check_collision(wall_grid, 'x')
+        elif dy:
+            self.rect.y += dy
+            self.check_collision(wall_grid, 'y')
         
-    def check_collision(self, walls_group, axis):
-        hits = pygame.sprite.spritecollide(self, walls_group, False)
-        if hits:
-            if axis == 'x':
-                if self.vel.x > 0: self.rect.right = hits[0].rect.left
-                if self.vel.x < 0: self.rect.left = hits[0].rect.right
-            if axis == 'y':
-                if self.vel.y > 0: self.rect.bottom = hits[0].rect.top
-                if self.vel.y < 0: self.rect.top = hits[0].rect.bottom
-            self.vel.x = 0
-            self.vel.y = 0
+    def check_collision(self, wall_grid, axis):
+        # the tank was clear of walls before this move, so only the tiles its
+        # leading edge moved into can hold one; the tank is pushed back
+        # against that column or row
+        size = s.TILE_SIZE
+        rect = self.rect
+        if axis == 'x':
+            tx = (rect.right - 1) // size if self.vel.x > 0 else rect.left // size
+            if not wall_grid.wall_in_column(tx, rect.top // size, (rect.bottom - 1) // size):
+                return
+            if self.vel.x > 0: rect.right = tx * size
+            else: rect.left = (tx + 1) * size
+        else:
+            ty = (rect.bottom - 1) // size if self.vel.y > 0 else rect.top // size
+            if not wall_grid.wall_in_row(ty, rect.left // size, (rect.right - 1) // size):
+                return
+            if self.vel.y > 0: rect.bottom = ty * size
+            else: rect.top = (ty + 1) * size
+        self.vel.update(0, 0)
             
     def take_damage(self, amount, owner): # owner here is to check who shoot
         # if enemy kills player, player can respawn. If player kills player, player killed loses.
@@ -152,22 +240,15 @@ class Tank(pygame.sprite.Sprite):
 class HeroTank(Tank):
     def __init__(self, x, y, player_num, game):
         self.player_num = player_num
+        self.owner = f"P{player_num}" # same tag as this tank's bullets
         self.player_speed = s.PLAYER_SPEED
         self.game = game 
-        self.images = {}
-        if self.player_num == 1:
-            self.images['UP'] = load_image(s.IMG_P1_UP)
-            self.images['DOWN'] = load_image(s.IMG_P1_DOWN)
-            self.images['LEFT'] = load_image(s.IMG_P1_LEFT)
-            self.images['RIGHT'] = load_image(s.IMG_P1_RIGHT)
-        else:
-            self.images['UP'] = load_image(s.IMG_P2_UP)
-            self.images['DOWN'] = load_image(s.IMG_P2_DOWN)
-            self.images['LEFT'] = load_image(s.IMG_P2_LEFT)
-            self.images['RIGHT'] = load_image(s.IMG_P2_RIGHT)
-        self.last_shot_time = pygame.time.get_ticks()
+        self.images = get_tank_images(f"P{self.player_num}") # shared, don't modify
+        self.last_shot_time = self.game.clock.get_ticks()
         self.shoot_cooldown = s.BULLET_COOLDOWN
         self.score = 0
+        self.damage_taken = 0 # hp lost this match, respawns included (vecenv.py rewards)
+        self.health_bar = HealthBar(s.PLAYER_HP)
         
         self.spawn_x_tile = x
         self.spawn_y_tile = y
@@ -175,41 +256,53 @@ class HeroTank(Tank):
         super().__init__(x, y, self.images['UP'], s.PLAYER_HP)
         self.direction = 'UP'
 
+    # direction held on this player's keys, None if none (Game.events steers)
     def get_input(self):
-        self.speed = 0
         keys = pygame.key.get_pressed()
         if self.player_num == 1:
-            if keys[s.P1_UP]:
-                self.speed = self.player_speed; self.direction = 'UP'; self.image = self.images['UP']
-            elif keys[s.P1_DOWN]:
-                self.speed = self.player_speed; self.direction = 'DOWN'; self.image = self.images['DOWN']
-            elif keys[s.P1_LEFT]:
-                self.speed = self.player_speed; self.direction = 'LEFT'; self.image = self.images['LEFT']
-            elif keys[s.P1_RIGHT]:
-                self.speed = self.player_speed; self.direction = 'RIGHT'; self.image = self.images['RIGHT']
-        elif self.player_num == 2:
-            if keys[s.P2_UP]:
-                self.speed = self.player_speed; self.direction = 'UP'; self.image = self.images['UP']
-            elif keys[s.P2_DOWN]:
-                self.speed = self.player_speed; self.direction = 'DOWN'; self.image = self.images['DOWN']
-            elif keys[s.P2_LEFT]:
-                self.speed = self.player_speed; self.direction = 'LEFT'; self.image = self.images['LEFT']
-            elif keys[s.P2_RIGHT]:
-                self.speed = self.player_speed; self.direction = 'RIGHT'; self.image = self.images['RIGHT']
+            up, down, left, right = s.P1_UP, s.P1_DOWN, s.P1_LEFT, s.P1_RIGHT
+        else:
+            up, down, left, right = s.P2_UP, s.P2_DOWN, s.P2_LEFT, s.P2_RIGHT
+        if keys[up]: return 'UP'
+        elif keys[down]: return 'DOWN'
+        elif keys[left]: return 'LEFT'
+        elif keys[right]: return 'RIGHT'
+        return None
+
+    # set the move direction for this frame, None stops the tank
+    # (keyboard and headless controllers both go through here)
+    def steer(self, direction):
+        self.speed = 0
+        if direction is not None:
+            self.speed = self.player_speed; self.direction = direction; self.image = self.images[direction]
 
     def shoot(self):
-        now = pygame.time.get_ticks()
+        now = self.game.clock.get_ticks()
         if now - self.last_shot_time > self.shoot_cooldown:
             self.last_shot_time = now
-            self.game.sound_fire.play()
+            self.game.audio.play('fire')
             owner = f"P{self.player_num}"
-            bullet = Bullet(self.rect.centerx, self.rect.centery, self.direction, owner)
-            self.game.all_sprites.add(bullet)
-            self.game.bullets.add(bullet)
+            self.game.add_bullet(self.rect.centerx, self.rect.centery, self.direction, owner)
 
     def heal(self, amount):
         self.hp = min(s.PLAYER_HP, self.hp + amount)
         
+    # back to the start of a match (Game.reset_world reuses both tanks)
+    def reset(self):
+        self.player_speed = s.PLAYER_SPEED
+        self.last_shot_time = self.game.clock.get_ticks()
+        self.shoot_cooldown = s.BULLET_COOLDOWN
+        self.score = 0
+        self.damage_taken = 0
+        if self.health_bar.max_hp != s.PLAYER_HP:
+            self.health_bar = HealthBar(s.PLAYER_HP)
+        self.speed = 0
+        self.vel.update(0, 0)
+        self.hp = s.PLAYER_HP
+        self.rect.topleft = (self.spawn_x_tile * s.TILE_SIZE, self.spawn_y_tile * s.TILE_SIZE)
+        self.direction = 'UP'
+        self.image = self.images['UP']
+
     def respawn(self):
         # for player to respawn
         print(f"Player {self.player_num} respawned!")
@@ -223,74 +316,123 @@ class HeroTank(Tank):
             return
             
         self.hp -= amount
+        self.damage_taken += amount
         
         if self.hp <= 0:
             if owner == 'Enemy': # killed by enemy tanks
-                self.game.sound_bang_player.play()
+                self.game.audio.play('bang_player')
                 self.respawn()
             else:
                 # killed by hero tank
                 print(f"Player {self.player_num} was killed by {owner}!")
-                self.game.sound_bang_player.play()
+                self.game.audio.play('bang_player')
                 self.game.game_over = True
                 self.game.playing = False
                 self.game.winner = owner
                 self.kill()
 
-    def draw_ui(self, surface):
-        draw_health_bar(surface, self.rect.x, self.rect.y - 10, self.hp, s.PLAYER_HP) #only hero tanks have HP bar
+    def ui(self, offset=(0, 0)): # offset = camera offset; (bar, x, y, hp) for HealthBar.draw
+        return self.health_bar, self.rect.x + offset[0], self.rect.y - 10 + offset[1], self.hp #only hero tanks have HP bar
 
 # class of enemy tank
 # most logic is same as hero tank
 class EnemyTank(Tank):
     def __init__(self, x, y, game):
         self.game = game
-        self.images = {}
-        self.type = random.choice(['white', 'green'])
+        self.owner = 'Enemy'
+        rng = game.spawn_rng
+        self.type = rng.choice(['white', 'green'])
         if self.type == 'white':
             hp = s.ENEMY_HP_WHITE
-            self.images['UP'] = load_image(s.IMG_ENEMY_WHITE_UP)
-            self.images['DOWN'] = load_image(s.IMG_ENEMY_WHITE_DOWN)
-            self.images['LEFT'] = load_image(s.IMG_ENEMY_WHITE_LEFT)
-            self.images['RIGHT'] = load_image(s.IMG_ENEMY_WHITE_RIGHT)
         else:
             hp = s.ENEMY_HP_GREEN
-            self.images['UP'] = load_image(s.IMG_ENEMY_GREEN_UP)
-            self.images['DOWN'] = load_image(s.IMG_ENEMY_GREEN_DOWN)
-            self.images['LEFT'] = load_image(s.IMG_ENEMY_GREEN_LEFT)
-            self.images['RIGHT'] = load_image(s.IMG_ENEMY_GREEN_RIGHT)
-        self.move_timer = pygame.time.get_ticks()
-        self.move_cooldown = random.randint(1000, 3000)
-        self.shoot_timer = pygame.time.get_ticks()
+        self.images = get_tank_images(self.type) # shared, don't modify
+        self.move_timer = self.game.clock.get_ticks()
+        self.move_cooldown = rng.randint(1000, 3000)
+        self.shoot_timer = self.game.clock.get_ticks()
         self.shoot_cooldown = s.ENEMY_SHOOT_COOLDOWN
-        self.direction = random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
+        self.direction = rng.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
+        self.goal = None # flow field followed ('P1', 'P2', 'boss'), None = wander
+        self.ai_phase = game.enemies_spawned # spreads throttled AI ticks over frames
         super().__init__(x, y, self.images[self.direction], hp)
         self.speed = s.ENEMY_SPEED 
 
-    def update(self, walls_group):
-        self.ai_move()
-        self.ai_shoot()
-        super().update(walls_group)
+    # rebuild an enemy from a snapshot (snapshot.load) without drawing from the
+    # RNG; the caller sets the timers, goal and speed
+    @classmethod
+    def restored(cls, game, x, y, direction, kind, hp):
+        enemy = cls.__new__(cls)
+        enemy.game = game
+        enemy.owner = 'Enemy'
+        enemy.type = kind
+        enemy.images = get_tank_images(kind)
+        enemy.shoot_cooldown = s.ENEMY_SHOOT_COOLDOWN
+        enemy.direction = direction
+        Tank.__init__(enemy, 0, 0, enemy.images[direction], hp)
+        enemy.rect.topleft = (x, y)
+        return enemy
+
+    def update(self, wall_grid):
+        if not self.ai_asleep():
+            self.ai_move()
+            self.ai_shoot()
+        super().update(wall_grid)
 
-    def ai_move(self): # randomly moving of enemy tanks
-        now = pygame.time.get_ticks()
+    # far from every player: only think every ENEMY_FAR_AI_INTERVAL frames
+    def ai_asleep(self):
+        radius = s.ENEMY_AI_ACTIVE_RADIUS * s.TILE_SIZE
+        if not radius or (self.game.frame_count + self.ai_phase) % s.ENEMY_FAR_AI_INTERVAL == 0:
+            return False
+        for player in self.game.players:
+            if max(abs(player.rect.x - self.rect.x), abs(player.rect.y - self.rect.y)) <= radius:
+                return False
+        return True
+
+    def ai_move(self): # enemy tanks chase a goal or move randomly
+        now = self.game.clock.get_ticks()
         if now - self.move_timer > self.move_cooldown:
             self.move_timer = now
-            self.move_cooldown = random.randint(1000, 3000)
-            self.direction = random.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
-            self.image = self.images[self.direction]
+            rng = self.game.ai_rng
+            self.move_cooldown = rng.randint(1000, 3000)
+            self.goal = None
+            if rng.random() < s.ENEMY_CHASE_CHANCE:
+                self.goal = self.game.pathing.nearest_goal(tile_of(self.rect))
+            if self.goal is None:
+                self.direction = rng.choice(['UP', 'DOWN', 'LEFT', 'RIGHT'])
+                self.image = self.images[self.direction]
             self.speed = s.ENEMY_SPEED 
+        if self.goal is not None:
+            self.follow_goal()
+
+    # turn only when lined up with a tile, then head for the neighbour tile the
+    # shared flow field says is closer to the goal
+    def follow_goal(self):
+        tx = round(self.rect.x / s.TILE_SIZE)
+        ty = round(self.rect.y / s.TILE_SIZE)
+        if abs(self.rect.x - tx * s.TILE_SIZE) >= self.speed or abs(self.rect.y - ty * s.TILE_SIZE) >= self.speed:
+            return
+        self.rect.topleft = (tx * s.TILE_SIZE, ty * s.TILE_SIZE)
+        direction = self.game.pathing.direction(self.goal, (tx, ty))
+        if direction is None:
+            self.goal = None # reached it (or it's cut off), wander again
+            return
+        self.direction = direction
+        self.image = self.images[direction]
 
-    def ai_shoot(self): # randomly shooting of enemy tanks
-        now = pygame.time.get_ticks()
+    def ai_shoot(self): # enemy tanks fire when a player is in clear sight
+        now = self.game.clock.get_ticks()
         if now - self.shoot_timer > self.shoot_cooldown:
+            if s.ENEMY_REQUIRE_CLEAR_SHOT:
+                direction = self.game.line_of_fire(tile_of(self.rect))
+                if direction is None:
+                    return # keep the shot ready until someone steps into view
+                self.direction = direction
+                self.image = self.images[direction]
             self.shoot_timer = now
             self.shoot()
 
     def shoot(self):
-        bullet = Bullet(self.rect.centerx, self.rect.centery, self.direction, 'Enemy')
-        self.game.all_sprites.add(bullet)
-        self.game.bullets.add(bullet)
+        self.game.add_bullet(self.rect.centerx, self.rect.centery, self.direction, 'Enemy')
 
     def take_damage(self, amount, owner):
         self.hp -= amount
@@ -299,10 +441,7 @@ class EnemyTank(Tank):
         if self.type == 'green' and self.hp == 1:
             print("Enemy changed from Green to White!")
             self.type = 'white'
-            self.images['UP'] = load_image(s.IMG_ENEMY_WHITE_UP)
-            self.images['DOWN'] = load_image(s.IMG_ENEMY_WHITE_DOWN)
-            self.images['LEFT'] = load_image(s.IMG_ENEMY_WHITE_LEFT)
-            self.images['RIGHT'] = load_image(s.IMG_ENEMY_WHITE_RIGHT)
+            self.images = get_tank_images('white')
             self.image = self.images[self.direction]
 
         return None
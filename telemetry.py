@@ -0,0 +1,111 @@
+# telemetry.py
+# opt-in frame telemetry: section timings (see FrameProfiler), entity counts
+# and collision test counts for every frame, an on-screen overlay toggled with
+# TELEMETRY_OVERLAY_KEY, and export to CSV or JSONL (picked by file extension)
+# on a background thread so file writes never stall a frame
+
+import csv
+import json
+import queue
+import threading
+import settings as s
+from profiling import FrameProfiler
+
+CSV_COLUMNS = ['match', 'frame', 'frame_ms', 'events_ms', 'update_ms', 'draw_ms',
+               'bullets', 'enemies', 'walls', 'collision_tests']
+OVERLAY_REFRESH = 15 # frames between overlay text updates
+
+
+class TelemetryWriter(threading.Thread):
+    def __init__(self, path):
+        threading.Thread.__init__(self, daemon=True)
+        self.path = path
+        self.rows = queue.Queue()
+        self.start()
+
+    def run(self):
+        with open(self.path, 'w', newline='') as f:
+            if self.path.endswith('.csv'):
+                writer = csv.DictWriter(f, CSV_COLUMNS, extrasaction='ignore')
+                writer.writeheader()
+                write = writer.writerow
+            else:
+                write = lambda row: f.write(json.dumps(row) + '\n')
+            while True:
+                row = self.rows.get()
+                if row is None:
+                    break
+                write(row)
+
+    # flush everything queued so far and stop
+    def close(self):
+        self.rows.put(None)
+        self.join()
+
+
+class Telemetry(FrameProfiler):
+    def __init__(self, game, path=None):
+        FrameProfiler.__init__(self)
+        self.game = game
+        self.writer = TelemetryWriter(path) if path else None
+        self.overlay = False
+        self.labels = []
+        self.last = {}
+        self.match = 0
+        self._tests = 0
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+
+    def new_match(self):
+        self.match += 1
+
+    def _collision_tests(self):
+        game = self.game
+        return game.broadphase.tests + game.wall_grid.lookups
+
+    def end_frame(self):
+        game = self.game
+        timings = self.current
+        tests = self._collision_tests()
+        ms = 1000.0
+        row = {
+            'match': self.match,
+            'frame': game.frame_count,
+            'frame_ms': round(sum(timings.values()) * ms, 4),
+            'events_ms': round(timings.get('events', 0.0) * ms, 4),
+            'update_ms': round(sum(v for k, v in timings.items() if k.startswith('update.')) * ms, 4),
+            'draw_ms': round(timings.get('draw', 0.0) * ms, 4),
+            'bullets': game.engine.bullet_count if game.engine is not None else len(game.bullets),
+            'enemies': game.enemy_count(),
+            'walls': len(game.walls),
+            'collision_tests': tests - self._tests,
+        }
+        self._tests = tests
+        self.last = row
+        if self.writer is not None:
+            row = dict(row, sections={k: round(v * ms, 4) for k, v in timings.items()})
+            self.writer.rows.put(row)
+
+    # on-screen overlay, returns the drawn rects
+    def draw_overlay(self, surface):
+        if not self.overlay or not self.last:
+            return []
+        if not self.labels:
+            from sprites import TextLabel # needs pygame.font, only when shown
+            x = s.SCREEN_WIDTH - 150
+            self.labels = [TextLabel(18, x, 70 + 20 * i, s.YELLOW, self.game.font_name) for i in range(4)]
+        if self.game.frame_count % OVERLAY_REFRESH == 0 or self.labels[0].text is None:
+            row = self.last
+            lines = [f"frame {row['frame_ms']:.2f} ms",
+                     f"upd {row['update_ms']:.2f} draw {row['draw_ms']:.2f}",
+                     f"B {row['bullets']} E {row['enemies']} W {row['walls']}",
+                     f"tests {row['collision_tests']}"]
+            for label, line in zip(self.labels, lines):
+                label.set_text(line)
+        return [label.draw(surface) for label in self.labels]
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
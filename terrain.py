@@ -0,0 +1,101 @@
+# terrain.py
+# static map layers baked into surfaces
+# walls go into an opaque base layer, bushes into a transparent overlay
+# drawn above the tanks; only the tile of a destroyed wall is redrawn
+# the map is split into square chunks baked the first time they come into
+# view, so a big map only pays for the part the camera has visited, and the
+# least recently drawn chunks are dropped beyond TERRAIN_CHUNK_CACHE
+
+import pygame
+import settings as s
+
+
+class TerrainLayer:
+    def __init__(self, walls, bushes, chunk_tiles=None):
+        self.chunk_size = (chunk_tiles or s.TERRAIN_CHUNK_TILES) * s.TILE_SIZE
+        self.rebuild(walls, bushes)
+
+    # sort walls and bushes into chunks, drop everything baked (only on new game)
+    def rebuild(self, walls, bushes):
+        self.walls = {}
+        self.bushes = {}
+        for wall in walls:
+            self.walls.setdefault(self._key(wall.rect), []).append(wall)
+        for bush in bushes:
+            self.bushes.setdefault(self._key(bush.rect), []).append(bush)
+        self.chunks = {} # (cx, cy) -> (base, overlay or None), oldest first
+
+    def _key(self, rect):
+        return rect.x // self.chunk_size, rect.y // self.chunk_size
+
+    def _bake(self, key):
+        size = (self.chunk_size, self.chunk_size)
+        origin = (-key[0] * self.chunk_size, -key[1] * self.chunk_size)
+        base = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            # match the display pixel format so the per-frame blit is a plain copy
+            base = base.convert()
+        base.fill(s.BLACK)
+        base.blits([(wall.image, wall.rect.move(origin)) for wall in self.walls.get(key, ())], False)
+        overlay = None
+        if key in self.bushes:
+            overlay = pygame.Surface(size, pygame.SRCALPHA)
+            if pygame.display.get_surface() is not None:
+                overlay = overlay.convert_alpha()
+            overlay.fill((0, 0, 0, 0))
+            overlay.blits([(bush.image, bush.rect.move(origin)) for bush in self.bushes[key]], False)
+        return base, overlay
+
+    def _chunk(self, key):
+        chunk = self.chunks.pop(key, None)
+        if chunk is None:
+            chunk = self._bake(key)
+            if len(self.chunks) >= s.TERRAIN_CHUNK_CACHE:
+                del self.chunks[next(iter(self.chunks))]
+        self.chunks[key] = chunk # most recently used last
+        return chunk
+
+    # called when a wall dies: clear just its tile
+    def remove_wall(self, wall):
+        key = self._key(wall.rect)
+        if wall in self.walls.get(key, ()):
+            self.walls[key].remove(wall)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            x, y = key
+            chunk[0].fill(s.BLACK, wall.rect.move(-x * self.chunk_size, -y * self.chunk_size))
+
+    # a destroyed wall is back (match restarted in place)
+    def restore_wall(self, wall):
+        key = self._key(wall.rect)
+        walls = self.walls.setdefault(key, [])
+        if wall not in walls: # its removal may not have been drawn yet
+            walls.append(wall)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            x, y = key
+            chunk[0].blit(wall.image, wall.rect.move(-x * self.chunk_size, -y * self.chunk_size))
+
+    # view is the camera rect in map pixels; area limits the blit to one
+    # screen rect (dirty-rect rendering)
+    def draw_base(self, surface, view, area=None):
+        self._draw(0, surface, view, area)
+
+    def draw_overlay(self, surface, view, area=None):
+        self._draw(1, surface, view, area)
+
+    def _draw(self, layer, surface, view, area):
+        region = view if area is None else pygame.Rect(area).move(view.topleft).clip(view)
+        if not region:
+            return
+        size = self.chunk_size
+        blits = []
+        for cy in range(region.top // size, (region.bottom - 1) // size + 1):
+            for cx in range(region.left // size, (region.right - 1) // size + 1):
+                if layer and (cx, cy) not in self.bushes:
+                    continue # no bushes, nothing to overlay
+                image = self._chunk((cx, cy))[layer]
+                chunk_rect = pygame.Rect(cx * size, cy * size, size, size)
+                src = region.clip(chunk_rect)
+                blits.append((image, (src.x - view.x, src.y - view.y), src.move(-chunk_rect.x, -chunk_rect.y)))
+        surface.blits(blits, False)
@@ -0,0 +1,222 @@
+# vecenv.py
+# many headless matches in one process, stepped together, for training bots
+#
+#   env = VecEnv(64, seed=1)
+#   obs = env.reset()                                # (N, CHANNELS, H, W) uint8
+#   obs, rewards, dones, infos = env.step(actions)   # actions: (N, 2) ints
+#
+# an action is a direction index (replay.DIRECTIONS, 4 = stand still), plus
+# SHOOT to fire; each row of actions holds P1's and P2's. Rewards are (N, 2)
+# float32 per player from score, hp lost and the match outcome (REWARD_* in
+# settings.py). A match that ends is restarted in place at once, infos[i]
+# then holds its last observation and batch.match_result().
+# Observations are rasterized from the map grid and entity positions, one
+# channel per wall kind, bushes, each player, enemies and bullets (1 where a
+# tile holds one); nothing is drawn. obs is the same array every step,
+# overwritten in place: copy it to keep it.
+#
+#   python vecenv.py [--envs 16] [--steps 2000] [--engine numpy]   (speed test)
+
+import argparse
+import random
+import sys
+import time
+from itertools import chain
+
+import numpy as np
+import settings as s
+from replay import DIRECTIONS
+
+SHOOT = len(DIRECTIONS)
+NUM_ACTIONS = 2 * len(DIRECTIONS)
+ACTION_INPUTS = [(direction, shoot) for shoot in (False, True) for direction in DIRECTIONS]
+RED_WALL, IRON_WALL, BOSS, BUSH, PLAYER1, PLAYER2, ENEMIES, BULLETS = range(8)
+CHANNELS = 8
+ENTITY_CHANNELS = (PLAYER1, PLAYER2, ENEMIES, BULLETS)
+WALL_CHANNELS = {s.MAP_TILE_RED_WALL: RED_WALL, s.MAP_TILE_IRON_WALL: IRON_WALL, s.MAP_TILE_BOSS: BOSS}
+
+
+class VecEnv:
+    def __init__(self, num_envs, seed=0, engine='sprites', game_map=None, max_frames=s.FPS * 60 * 5):
+        from main import Game
+        import mapfile
+        if isinstance(game_map, str):
+            game_map = mapfile.load(game_map)
+        self.num_envs = num_envs
+        self.max_frames = max_frames
+        self.rng = random.Random(seed) # match seeds
+        self.inputs = [[(None, False), (None, False)] for _ in range(num_envs)]
+        self.games = [Game(headless=True, controller=self._controller(i), engine=engine, game_map=game_map)
+                      for i in range(num_envs)]
+        level = self.games[0].level
+        self.obs = np.zeros((num_envs, CHANNELS, level.height, level.width), np.uint8)
+        self.walls = [None] * num_envs # (channel, ty, tx) arrays over game.wall_list
+        self.walls_drawn = [-1] * num_envs # len(game.walls) when the wall channels were drawn
+        self.last = [None] * num_envs # [score, damage taken] per player at the last step
+        self.engine = None # with engine='numpy', one ArrayEngine batch stepping every game's enemies and bullets
+
+    @property
+    def observation_shape(self):
+        return self.obs.shape[1:]
+
+    def _controller(self, i):
+        inputs = self.inputs
+        def control(game, player):
+            return inputs[i][player.player_num - 1]
+        return control
+
+    def reset(self):
+        for i in range(self.num_envs):
+            self._reset(i)
+        if self.engine is None and self.games[0].engine is not None:
+            from soa import ArrayEngine
+            self.engine = ArrayEngine.batch([game.engine for game in self.games])
+        self._observe(range(self.num_envs))
+        return self.obs
+
+    def _reset(self, i):
+        from simclock import SimClock
+        game = self.games[i]
+        game.clock = SimClock()
+        game.new_game(seed=self.rng.getrandbits(32))
+        game.playing = True
+        if self.engine is not None:
+            self.engine.attach(i, game.engine)
+        if self.walls[i] is None:
+            # the world and its wall list are reused by every later match
+            walls = game.wall_list
+            self.walls[i] = (np.array([WALL_CHANNELS[wall.wall_type] for wall in walls], np.intp),
+                             np.array([wall.rect.y // s.TILE_SIZE for wall in walls], np.intp),
+                             np.array([wall.rect.x // s.TILE_SIZE for wall in walls], np.intp))
+            for bush in game.bushes:
+                self.obs[i, BUSH, bush.rect.y // s.TILE_SIZE, bush.rect.x // s.TILE_SIZE] = 1
+        self.walls_drawn[i] = -1
+        self.last[i] = [[0, 0], [0, 0]]
+
+    # actions: (num_envs, 2) ints below NUM_ACTIONS
+    def step(self, actions):
+        inputs = self.inputs
+        for i, (a1, a2) in enumerate(np.asarray(actions).tolist()):
+            inputs[i][0] = ACTION_INPUTS[a1]
+            inputs[i][1] = ACTION_INPUTS[a2]
+        rewards = []
+        dones = np.zeros(self.num_envs, bool)
+        infos = [{} for _ in range(self.num_envs)]
+        if self.engine is None:
+            for game in self.games:
+                game.step(self.max_frames)
+        else:
+            # Game.step, with every game's array engine updated as one batch
+            for game in self.games:
+                game.begin_step()
+                game.update_players()
+            self.engine.update()
+            for game in self.games:
+                game.check_victory()
+                game.end_step(self.max_frames)
+        for i, game in enumerate(self.games):
+            rewards.append(self._rewards(i, game))
+            if not game.playing:
+                from batch import match_result
+                self._observe([i])
+                dones[i] = True
+                infos[i] = {'final_obs': self.obs[i].copy(), 'result': match_result(game)}
+                self._reset(i)
+        self._observe(range(self.num_envs))
+        return self.obs, np.array(rewards, np.float32), dones, infos
+
+    def _rewards(self, i, game):
+        rewards = [0.0, 0.0]
+        for k, player in enumerate((game.player1, game.player2)):
+            last = self.last[i][k]
+            rewards[k] = (s.REWARD_SCORE * (player.score - last[0]) +
+                          s.REWARD_DAMAGE * (player.damage_taken - last[1]))
+            last[0], last[1] = player.score, player.damage_taken
+        if game.game_over and game.winner is not None:
+            won = 0 if game.winner == 'P1' else 1
+            rewards[won] += s.REWARD_WIN
+            rewards[1 - won] -= s.REWARD_WIN
+        elif game.game_victory:
+            rewards[0] += s.REWARD_VICTORY
+            rewards[1] += s.REWARD_VICTORY
+        return rewards
+
+    # marks the walls and entities of the envs given (all of them after a
+    # step) with one clear and one scatter over the batch instead of a few
+    # small NumPy writes per env
+    def _observe(self, envs):
+        batch = self.engine
+        sprite_channels = ENTITY_CHANNELS if batch is None else (PLAYER1, PLAYER2)
+        counts, centres = [], [] # sprites per (env, channel), their centres in pixels
+        for i in envs:
+            game = self.games[i]
+            if len(game.walls) != self.walls_drawn[i]:
+                self._draw_walls(i)
+            found = [[game.player1.rect.center] if game.player1.alive() else [],
+                     [game.player2.rect.center] if game.player2.alive() else []]
+            if batch is None:
+                found += [[enemy.rect.center for enemy in game.enemies],
+                          [bullet.rect.center for bullet in game.bullets]]
+            for sprites in found:
+                centres += sprites
+                counts.append(len(sprites))
+        obs = self.obs
+        tiles = np.fromiter(chain.from_iterable(centres), np.intp, 2 * len(centres)).reshape(-1, 2)
+        env_index = np.repeat(np.repeat(envs, len(sprite_channels)), counts)
+        channels = np.repeat(np.tile(sprite_channels, len(envs)), counts)
+        if batch is not None:
+            # enemies and bullets of every game straight from the batch arrays
+            half, bhalf = batch.tank_size // 2, batch.bullet_size // 2
+            x = np.concatenate((batch.ex + half, batch.bx + bhalf))
+            y = np.concatenate((batch.ey + half, batch.by + bhalf))
+            entity_env = np.concatenate((batch.eenv, batch.benv))
+            entity_channel = np.repeat((ENEMIES, BULLETS), (len(batch.ex), len(batch.bx)))
+            if len(envs) != self.num_envs:
+                wanted = np.isin(entity_env, list(envs))
+                x, y, entity_env, entity_channel = x[wanted], y[wanted], entity_env[wanted], entity_channel[wanted]
+            tiles = np.concatenate((tiles, np.stack((x, y), axis=1)))
+            env_index = np.concatenate((env_index, entity_env))
+            channels = np.concatenate((channels, entity_channel))
+        tiles //= s.TILE_SIZE
+        np.clip(tiles, 0, (obs.shape[3] - 1, obs.shape[2] - 1), out=tiles)
+        if len(envs) == self.num_envs:
+            obs[:, PLAYER1:] = 0
+        else:
+            obs[envs, PLAYER1:] = 0
+        obs[env_index, channels, tiles[:, 1], tiles[:, 0]] = 1
+
+    # walls only change when one is destroyed
+    def _draw_walls(self, i):
+        game = self.games[i]
+        obs = self.obs[i]
+        channel, ty, tx = self.walls[i]
+        alive = np.fromiter((wall.alive() for wall in game.wall_list), bool, len(game.wall_list))
+        obs[:BUSH] = 0
+        obs[channel[alive], ty[alive], tx[alive]] = 1
+        self.walls_drawn[i] = len(game.walls)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='step random actions through a VecEnv and report the speed')
+    parser.add_argument('--envs', type=int, default=16)
+    parser.add_argument('--steps', type=int, default=2000, help='steps of the whole batch')
+    parser.add_argument('--engine', choices=['sprites', 'numpy'], default='sprites')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    env = VecEnv(args.envs, seed=args.seed, engine=args.engine)
+    rng = np.random.default_rng(args.seed)
+    env.reset()
+    matches = 0
+    started = time.perf_counter()
+    for _ in range(args.steps):
+        _, _, dones, _ = env.step(rng.integers(0, NUM_ACTIONS, (args.envs, 2)))
+        matches += int(dones.sum())
+    elapsed = time.perf_counter() - started
+    steps = args.envs * args.steps
+    print(f"{steps} env steps in {elapsed:.2f}s: {steps / elapsed:.0f} steps/s, {matches} matches finished")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())